@@ -1,6 +1,18 @@
 # -*- mode: python ; coding: utf-8 -*-
-"""PyInstaller spec for VoiceToType with bundled Whisper model and FFmpeg."""
+"""PyInstaller spec for VoiceToType with bundled Whisper model and FFmpeg.
 
+Profiles (env VOICETOTYPE_BUILD_PROFILE):
+  slim    (default) onedir layout: no per-launch extraction into _MEIPASS,
+          torch test/header/dev files dropped, UPX skipped on large libraries.
+  onefile legacy single EXE (unpacks everything on every launch).
+
+Env VOICETOTYPE_BUNDLE_MODELS selects which whisper_model/*.pt files ship
+(comma separated, default "base"). A size/startup report is written to
+dist/VoiceToType-build-report.json after each build.
+"""
+
+import os
+import sys
 from pathlib import Path
 
 from PyInstaller.utils.hooks import collect_all
@@ -9,6 +21,39 @@ block_cipher = None
 project_dir = Path.cwd()
 whisper_model_dir = project_dir / "whisper_model"
 
+build_profile = os.environ.get("VOICETOTYPE_BUILD_PROFILE", "slim").strip().lower()
+if build_profile not in ("slim", "onefile"):
+    raise SystemExit(f"Unknown VOICETOTYPE_BUILD_PROFILE: {build_profile} (use slim or onefile)")
+bundle_models = [name.strip() for name in os.environ.get("VOICETOTYPE_BUNDLE_MODELS", "base").split(",") if name.strip()]
+
+# Modules the app never imports at runtime; collect_all would otherwise drag them in.
+excluded_modules = [
+    "torch.utils.tensorboard",
+    "torch.utils.benchmark",
+    "torch.testing._internal",
+    "tensorboard",
+    "caffe2",
+    "matplotlib",
+    "IPython",
+    "pytest",
+]
+
+# Build-time-only files inside collected packages (headers, static libs, tests, stubs).
+dropped_path_parts = ("/include/", "/test/", "/tests/", "/testing/_internal/", "/share/cmake/", "/utils/benchmark/")
+dropped_suffixes = (".h", ".hpp", ".cuh", ".pyi", ".lib", ".a")
+
+
+def _keep_file(source: str) -> bool:
+    normalized = source.replace("\\", "/").lower()
+    if normalized.endswith(dropped_suffixes):
+        return False
+    return not any(part in normalized for part in dropped_path_parts)
+
+
+def _keep_module(name: str) -> bool:
+    return not any(name == excluded or name.startswith(excluded + ".") for excluded in excluded_modules)
+
+
 # Collect package binaries/data/hiddenimports for runtime stability in EXE.
 datas = []
 binaries = []
@@ -16,12 +61,16 @@ hiddenimports = []
 
 for package_name in ["whisper", "torch", "numpy", "imageio_ffmpeg", "tiktoken"]:
     pkg_datas, pkg_bins, pkg_hidden = collect_all(package_name)
-    datas += pkg_datas
-    binaries += pkg_bins
-    hiddenimports += pkg_hidden
+    datas += [item for item in pkg_datas if _keep_file(item[0])]
+    binaries += [item for item in pkg_bins if _keep_file(item[0])]
+    hiddenimports += [name for name in pkg_hidden if _keep_module(name)]
 
-# Bundle local Whisper model directory into exe resources.
-datas.append((str(whisper_model_dir), "whisper_model"))
+# Bundle only the selected Whisper checkpoints instead of the whole folder.
+for model_name in bundle_models:
+    checkpoint = whisper_model_dir / f"{model_name}.pt"
+    if not checkpoint.exists():
+        raise SystemExit(f"Missing {checkpoint}; download it first (see README).")
+    datas.append((str(checkpoint), "whisper_model"))
 
 
 a = Analysis(
@@ -33,7 +82,7 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=excluded_modules,
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=block_cipher,
@@ -42,19 +91,59 @@ a = Analysis(
 
 pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
 
-exe = EXE(
-    pyz,
-    a.scripts,
-    a.binaries,
-    a.zipfiles,
-    a.datas,
-    [],
-    name="VoiceToType",
-    debug=False,
-    bootloader_ignore_signals=False,
-    strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
-    console=False,
+# UPX on torch/CUDA/MKL-sized libraries costs far more in launch-time decompression
+# than it saves on disk, and breaks some of them outright.
+UPX_SIZE_LIMIT = 5 * 1024 * 1024
+upx_exclude = sorted(
+    {Path(dest).name for dest, source, _ in a.binaries if source and Path(source).stat().st_size > UPX_SIZE_LIMIT}
 )
+
+if build_profile == "onefile":
+    exe = EXE(
+        pyz,
+        a.scripts,
+        a.binaries,
+        a.zipfiles,
+        a.datas,
+        [],
+        name="VoiceToType",
+        debug=False,
+        bootloader_ignore_signals=False,
+        strip=False,
+        upx=True,
+        upx_exclude=upx_exclude,
+        runtime_tmpdir=None,
+        console=False,
+    )
+    # EXE resolves the final path itself (dist/ prefix, ".exe" only on Windows).
+    output_path = Path(exe.name)
+else:
+    exe = EXE(
+        pyz,
+        a.scripts,
+        [],
+        exclude_binaries=True,
+        name="VoiceToType",
+        debug=False,
+        bootloader_ignore_signals=False,
+        strip=False,
+        upx=True,
+        upx_exclude=upx_exclude,
+        console=False,
+    )
+    coll = COLLECT(
+        exe,
+        a.binaries,
+        a.zipfiles,
+        a.datas,
+        strip=False,
+        upx=True,
+        upx_exclude=upx_exclude,
+        name="VoiceToType",
+    )
+    output_path = Path(DISTPATH) / "VoiceToType"
+
+sys.path.insert(0, str(project_dir / "tools"))
+from build_report import write_build_report  # noqa: E402
+
+write_build_report(output_path, build_profile, bundle_models, Path(DISTPATH) / "VoiceToType-build-report.json")
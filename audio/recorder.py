@@ -4,77 +4,63 @@ from __future__ import annotations
 
 import tempfile
 import wave
-from dataclasses import dataclass
 from pathlib import Path
 from threading import Lock
-from typing import List
+from typing import Callable, List
 
 import numpy as np
-import sounddevice as sd
+
+from audio.sources import AudioSource, AudioSourceError, MicrophoneSource, RecordingConfig
 
 
 class AudioRecorderError(Exception):
     """Raised when audio recording cannot continue."""
 
 
-@dataclass(frozen=True)
-class RecordingConfig:
-    """Simple audio settings used by the recorder."""
-
-    sample_rate: int = 16000
-    channels: int = 1
-    dtype: str = "int16"
-
-
 class AudioRecorder:
-    """Stream-based recorder that writes microphone input to a WAV temp file."""
+    """Collect frames from an ``AudioSource`` (microphone by default) into one clip."""
 
-    def __init__(self, config: RecordingConfig | None = None) -> None:
-        self.config = config or RecordingConfig()
+    def __init__(self, config: RecordingConfig | None = None, source: AudioSource | None = None) -> None:
+        self.config = source.config if source is not None else (config or RecordingConfig())
+        self.source = source or MicrophoneSource(self.config)
         self._frames: List[np.ndarray] = []
         self._lock = Lock()
-        self._stream: sd.InputStream | None = None
         self._is_recording = False
 
     @property
     def is_recording(self) -> bool:
         return self._is_recording
 
-    def start(self) -> None:
-        """Start capturing microphone frames."""
+    def start(self, on_source_finished: Callable[[], None] | None = None) -> None:
+        """Start capturing frames; ``on_source_finished`` fires when a finite source runs dry."""
         if self._is_recording:
             raise AudioRecorderError("Recorder is already running.")
 
         self._frames = []
 
         try:
-            self._stream = sd.InputStream(
-                samplerate=self.config.sample_rate,
-                channels=self.config.channels,
-                dtype=self.config.dtype,
-                callback=self._on_audio_callback,
-            )
-            self._stream.start()
+            self.source.start(self._on_frames, on_source_finished)
             self._is_recording = True
-        except Exception as exc:  # pragma: no cover - hardware dependent
-            self._stream = None
+        except AudioSourceError as exc:
             self._is_recording = False
-            raise AudioRecorderError("Unable to access microphone.") from exc
+            raise AudioRecorderError(str(exc)) from exc
 
-    def stop_and_save(self) -> Path:
-        """Stop recording and save the captured audio into a temp WAV file."""
-        if not self._is_recording or self._stream is None:
+    def stop_and_collect(self) -> np.ndarray:
+        """Stop recording and return the captured ``(frames, channels)`` samples."""
+        if not self._is_recording:
             raise AudioRecorderError("Recorder is not running.")
 
-        self._stream.stop()
-        self._stream.close()
-        self._stream = None
+        self.source.stop()
         self._is_recording = False
 
         with self._lock:
             if not self._frames:
                 raise AudioRecorderError("No audio data was captured.")
-            audio_data = np.concatenate(self._frames, axis=0)
+            return np.concatenate(self._frames, axis=0)
+
+    def stop_and_save(self) -> Path:
+        """Stop recording and save the captured audio into a temp WAV file."""
+        audio_data = self.stop_and_collect()
 
         temp_file = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
         temp_path = Path(temp_file.name)
@@ -88,9 +74,7 @@ class AudioRecorder:
 
         return temp_path
 
-    def _on_audio_callback(self, indata, frames, time, status) -> None:  # noqa: ANN001
-        """Collect each audio chunk from the sounddevice callback."""
-        if status:  # pragma: no cover - depends on audio hardware behavior
-            return
+    def _on_frames(self, frames: np.ndarray) -> None:
+        """Collect each audio block delivered by the source."""
         with self._lock:
-            self._frames.append(indata.copy())
+            self._frames.append(frames)
@@ -0,0 +1,316 @@
+"""Pluggable audio inputs: live microphone, file replay and raw PCM pipes."""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+import wave
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterator
+
+import numpy as np
+
+
+class AudioSourceError(Exception):
+    """Raised when an audio source cannot be opened or read."""
+
+
+@dataclass(frozen=True)
+class RecordingConfig:
+    """Simple audio settings used by the recorder."""
+
+    sample_rate: int = 16000
+    channels: int = 1
+    dtype: str = "int16"
+
+
+FrameCallback = Callable[[np.ndarray], None]
+FinishedCallback = Callable[[], None]
+
+
+class AudioSource(ABC):
+    """Produce ``(frames, channels)`` blocks in ``config`` format to a callback."""
+
+    def __init__(self, config: RecordingConfig | None = None) -> None:
+        self.config = config or RecordingConfig()
+
+    @abstractmethod
+    def start(self, on_frames: FrameCallback, on_finished: FinishedCallback | None = None) -> None:
+        """Begin delivering frames; ``on_finished`` fires if the input runs dry."""
+
+    @abstractmethod
+    def stop(self) -> None:
+        """Stop delivering frames and release the underlying device or handle."""
+
+
+class MicrophoneSource(AudioSource):
+    """Live capture through a ``sounddevice`` input stream."""
+
+    def __init__(self, config: RecordingConfig | None = None) -> None:
+        super().__init__(config)
+        self._stream = None
+        self._on_frames: FrameCallback | None = None
+
+    def start(self, on_frames: FrameCallback, on_finished: FinishedCallback | None = None) -> None:
+        # Imported lazily so servers without PortAudio can still use file/pipe sources.
+        import sounddevice as sd
+
+        self._on_frames = on_frames
+        try:
+            self._stream = sd.InputStream(
+                samplerate=self.config.sample_rate,
+                channels=self.config.channels,
+                dtype=self.config.dtype,
+                callback=self._on_audio_callback,
+            )
+            self._stream.start()
+        except Exception as exc:  # pragma: no cover - hardware dependent
+            self._stream = None
+            raise AudioSourceError("Unable to access microphone.") from exc
+
+    def stop(self) -> None:
+        if self._stream is None:
+            return
+        self._stream.stop()
+        self._stream.close()
+        self._stream = None
+
+    def _on_audio_callback(self, indata, frames, time, status) -> None:  # noqa: ANN001
+        """Collect each audio chunk from the sounddevice callback."""
+        if status:  # pragma: no cover - depends on audio hardware behavior
+            return
+        if self._on_frames is not None:
+            self._on_frames(indata.copy())
+
+
+class _StreamSource(AudioSource):
+    """Byte-stream input carrying raw PCM, decoded into ``(frames, channels)`` blocks."""
+
+    def __init__(self, config: RecordingConfig | None = None, block_frames: int = 1600) -> None:
+        super().__init__(config)
+        self.block_frames = block_frames
+
+    @abstractmethod
+    def _open(self) -> BinaryIO:
+        """Return a binary handle positioned at the first PCM byte."""
+
+    def _close(self, handle: BinaryIO) -> None:
+        handle.close()
+
+    def _iter_blocks(self, handle: BinaryIO, stop_event: threading.Event | None = None) -> Iterator[np.ndarray]:
+        dtype = np.dtype(self.config.dtype)
+        frame_bytes = dtype.itemsize * self.config.channels
+        block_bytes = frame_bytes * self.block_frames
+        pending = b""
+
+        while stop_event is None or not stop_event.is_set():
+            data = handle.read(block_bytes)
+            if not data:
+                return
+            pending += data
+            usable = len(pending) - len(pending) % frame_bytes
+            if not usable:
+                continue
+            block = np.frombuffer(pending[:usable], dtype=dtype).reshape(-1, self.config.channels)
+            pending = pending[usable:]
+            yield block.copy()
+
+
+class FileSource(_StreamSource):
+    """Replay a WAV file, or a headerless ``.raw``/``.pcm`` file, at real-time or max speed."""
+
+    def __init__(
+        self,
+        path: Path,
+        config: RecordingConfig | None = None,
+        block_frames: int = 1600,
+        realtime: bool = False,
+    ) -> None:
+        super().__init__(config, block_frames=block_frames)
+        self.path = path
+        self.realtime = realtime
+        # Each run owns its stop event, so a late reader can never be revived by the next start().
+        self._run_stop: threading.Event | None = None
+        self._thread: threading.Thread | None = None
+
+    def start(self, on_frames: FrameCallback, on_finished: FinishedCallback | None = None) -> None:
+        if self._thread is not None:
+            raise AudioSourceError("Audio source is already running.")
+        handle = self._open()
+        stop_event = threading.Event()
+        self._run_stop = stop_event
+        self._thread = threading.Thread(
+            target=self._pump,
+            args=(handle, stop_event, on_frames, on_finished),
+            name="FileSource-reader",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        stop_event, thread = self._run_stop, self._thread
+        self._run_stop = None
+        self._thread = None
+        if stop_event is not None:
+            stop_event.set()
+        # File reads never block for long; the finished callback may call stop() from the reader itself.
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=1.0)
+
+    def _pump(
+        self,
+        handle: BinaryIO,
+        stop_event: threading.Event,
+        on_frames: FrameCallback,
+        on_finished: FinishedCallback | None,
+    ) -> None:
+        started_at = time.monotonic()
+        delivered_frames = 0
+        try:
+            for block in self._iter_blocks(handle, stop_event):
+                on_frames(block)
+                delivered_frames += len(block)
+                if self.realtime:
+                    # Pace against wall clock so replay matches real capture timing.
+                    due = started_at + delivered_frames / self.config.sample_rate
+                    delay = due - time.monotonic()
+                    if delay > 0:
+                        stop_event.wait(delay)
+        finally:
+            self._close(handle)
+
+        if not stop_event.is_set() and on_finished is not None:
+            on_finished()
+
+    def _open(self) -> BinaryIO:
+        if not self.path.is_file():
+            raise AudioSourceError(f"Audio file not found: {self.path}")
+        if self.path.suffix.lower() != ".wav":
+            return self.path.open("rb")
+
+        try:
+            wav_file = wave.open(str(self.path), "rb")
+        except (wave.Error, EOFError) as exc:
+            raise AudioSourceError(f"Invalid WAV file: {self.path}") from exc
+
+        expected = (self.config.sample_rate, self.config.channels, np.dtype(self.config.dtype).itemsize)
+        actual = (wav_file.getframerate(), wav_file.getnchannels(), wav_file.getsampwidth())
+        if actual != expected:
+            wav_file.close()
+            raise AudioSourceError(
+                f"WAV format {actual} does not match recorder config {expected} (rate, channels, sample width)."
+            )
+        return _WaveReader(wav_file)
+
+
+class PipeSource(_StreamSource):
+    """Read raw PCM from stdin or a named pipe (FIFO) written by another tool.
+
+    A pipe read can block indefinitely, so one reader thread lives as long as
+    the stream and recordings only switch delivery on and off.  Audio written
+    while no recording is active is read and dropped, as a microphone would.
+    """
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        config: RecordingConfig | None = None,
+        block_frames: int = 1600,
+        stream: BinaryIO | None = None,
+    ) -> None:
+        super().__init__(config, block_frames=block_frames)
+        self.path = path
+        self.stream = stream
+        self._lock = threading.Lock()
+        self._on_frames: FrameCallback | None = None
+        self._on_finished: FinishedCallback | None = None
+        self._reader: threading.Thread | None = None
+
+    def start(self, on_frames: FrameCallback, on_finished: FinishedCallback | None = None) -> None:
+        if self.path is not None and self.stream is None and not self.path.exists():
+            raise AudioSourceError(f"Pipe not found: {self.path}")
+        with self._lock:
+            if self._on_frames is not None:
+                raise AudioSourceError("Audio source is already running.")
+            if self._reader is None or not self._reader.is_alive():
+                # First recording, or the previous writer closed the pipe.  The reader opens the
+                # pipe itself: opening a FIFO blocks until a writer connects, and start() runs
+                # under the recorder and engine locks.
+                self._reader = threading.Thread(target=self._read_loop, name="PipeSource-reader", daemon=True)
+                self._reader.start()
+            self._on_frames = on_frames
+            self._on_finished = on_finished
+
+    def stop(self) -> None:
+        # Returns at once even if the reader is blocked in open() or read(); it simply stops delivering.
+        with self._lock:
+            self._on_frames = None
+            self._on_finished = None
+
+    def _read_loop(self) -> None:
+        try:
+            handle = self._open()
+        except AudioSourceError:
+            handle = None
+
+        if handle is not None:
+            try:
+                for block in self._iter_blocks(handle):
+                    # Delivering under the lock guarantees no block lands after stop() returns.
+                    with self._lock:
+                        if self._on_frames is not None:
+                            self._on_frames(block)
+            finally:
+                self._close(handle)
+
+        with self._lock:
+            on_finished = self._on_finished
+        if on_finished is not None:
+            on_finished()
+
+    def _open(self) -> BinaryIO:
+        if self.stream is not None:
+            return self.stream
+        if self.path is None:
+            return sys.stdin.buffer
+        try:
+            return self.path.open("rb")
+        except OSError as exc:
+            raise AudioSourceError(f"Unable to open pipe: {self.path}") from exc
+
+    def _close(self, handle: BinaryIO) -> None:
+        # Never close process stdin or a caller-owned stream.
+        if self.path is not None and self.stream is None:
+            handle.close()
+
+
+class _WaveReader:
+    """Adapt ``wave.Wave_read`` to the ``read(n_bytes)`` interface used by the pump."""
+
+    def __init__(self, wav_file: wave.Wave_read) -> None:
+        self._wav_file = wav_file
+        self._frame_bytes = wav_file.getsampwidth() * wav_file.getnchannels()
+
+    def read(self, size: int) -> bytes:
+        return self._wav_file.readframes(max(1, size // self._frame_bytes))
+
+    def close(self) -> None:
+        self._wav_file.close()
+
+
+def create_source(spec: str, config: RecordingConfig | None = None, realtime: bool = False) -> AudioSource:
+    """Build a source from a CLI spec: ``mic``, ``file:PATH``, ``pipe:PATH`` or ``stdin``."""
+    kind, _, target = spec.partition(":")
+    kind = kind.strip().lower()
+    if kind in ("", "mic", "microphone"):
+        return MicrophoneSource(config)
+    if kind == "stdin":
+        return PipeSource(config=config)
+    if kind == "file" and target:
+        return FileSource(Path(target), config=config, realtime=realtime)
+    if kind == "pipe" and target:
+        return PipeSource(Path(target), config=config)
+    raise AudioSourceError("Unsupported audio source. Try: mic, file:PATH, pipe:PATH or stdin.")
@@ -1,16 +1,167 @@
-"""Entry point for the VoiceToType desktop application."""
+"""Entry point for the VoiceToType desktop application and headless daemon."""
 
 from __future__ import annotations
 
-from tkinter import messagebox, Tk
+import argparse
+import json
+import signal
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
 
 from runtime_patch import patch_runtime_environment
-from services.local_transcriber import LocalTranscriberError, preload_model
+from services.audio_archive import ArchiveConfig
+from services.engine_client import DEFAULT_PORT, EngineClient, RemoteEngine
 from services.single_instance import SingleInstanceManager
-from ui.main_window import VoiceToTypeApp
+from services.text_delivery import create_clipboard_backend
 
+if TYPE_CHECKING:
+    from services.engine import EngineConfig
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="VoiceToType local speech-to-text.")
+    parser.add_argument("--headless", action="store_true", help="Run the engine daemon without the Tk window.")
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=DEFAULT_PORT,
+        help="Daemon control port on 127.0.0.1 (Windows; POSIX uses a per-user Unix socket).",
+    )
+    parser.add_argument("--hotkey", default="right alt", help="Recording hotkey or chord (e.g. ctrl+alt+r).")
+    parser.add_argument(
+        "--hotkey-mode",
+        choices=["toggle", "hold"],
+        default="toggle",
+        help="toggle: press to start/stop; hold: record while the hotkey is held.",
+    )
+    parser.add_argument(
+        "--cancel-hotkey",
+        default="",
+        help="Chord that discards the current recording (e.g. ctrl+alt+x); disabled by default.",
+    )
+    parser.add_argument(
+        "--refine-model",
+        default="",
+        help="Re-decode low-confidence segments with this larger model (e.g. small, medium).",
+    )
+    parser.add_argument(
+        "--model-idle-minutes",
+        type=float,
+        default=0.0,
+        help="Unload Whisper models after this many idle minutes (0 = always resident).",
+    )
+    parser.add_argument("--keep-segments", action="store_true", help="Store segment timing/confidence with history.")
+    parser.add_argument("--word-timestamps", action="store_true", help="Also store word-level timings (slower).")
+    parser.add_argument("--archive", action="store_true", help="Keep a compressed copy of each recording.")
+    parser.add_argument("--archive-codec", choices=["flac", "opus"], default="flac", help="Archive codec.")
+    parser.add_argument("--archive-max-mb", type=int, default=500, help="Archive size limit in MB.")
+    parser.add_argument("--archive-max-days", type=float, default=30.0, help="Archive age limit in days.")
+    parser.add_argument("--type-output", action="store_true", help="Also type each result into the focused window.")
+    parser.add_argument("--typing-cps", type=float, default=400.0, help="Typing speed limit in characters per second.")
+    parser.add_argument("--no-hotkeys", action="store_true", help="Daemon only: disable the global hotkey listener.")
+    parser.add_argument("--no-clipboard", action="store_true", help="Daemon only: do not copy results to the clipboard.")
+    parser.add_argument(
+        "--audio-source",
+        default="mic",
+        help="Daemon only: mic, file:PATH, pipe:PATH or stdin (16 kHz mono int16 PCM).",
+    )
+    parser.add_argument("--realtime", action="store_true", help="Replay file sources at real-time speed.")
+    parser.add_argument("--startup-probe", type=Path, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def run_startup_probe(report_file: Path) -> None:
+    """Measure Whisper import and model-load time, write them as JSON and exit (used by tools/build_report.py)."""
+    # main.py itself stays light; the speech stack is the import cost worth reporting.
+    started = time.perf_counter()
+    from services.local_transcriber import get_memory_stats, preload_model
+
+    imported = time.perf_counter()
+    model_dir = patch_runtime_environment()
+    preload_model(model_dir)
+    loaded = time.perf_counter()
+    report_file.write_text(
+        json.dumps(
+            {
+                "import_seconds": round(imported - started, 3),
+                "model_load_seconds": round(loaded - imported, 3),
+                "rss_bytes": get_memory_stats()["rss_bytes"],
+            }
+        ),
+        encoding="utf-8",
+    )
+
+
+def _archive_config(args: argparse.Namespace) -> ArchiveConfig | None:
+    if not args.archive:
+        return None
+    return ArchiveConfig(
+        codec=args.archive_codec,
+        max_bytes=args.archive_max_mb * 1024 * 1024,
+        max_age_days=args.archive_max_days,
+    )
+
+
+def _engine_config(args: argparse.Namespace) -> EngineConfig:
+    """Engine settings shared by the daemon and the GUI's in-process engine."""
+    from services.engine import EngineConfig
+
+    return EngineConfig(
+        hotkey=args.hotkey,
+        hotkey_mode=args.hotkey_mode,
+        cancel_hotkey=args.cancel_hotkey,
+        type_into_window=args.type_output,
+        typing_chars_per_second=args.typing_cps,
+        keep_segments=args.keep_segments or args.word_timestamps,
+        word_timestamps=args.word_timestamps,
+        refine_model=args.refine_model,
+        archive=_archive_config(args),
+        model_idle_minutes=args.model_idle_minutes,
+    )
+
+
+def run_daemon(args: argparse.Namespace) -> None:
+    """Host recorder, hotkeys, resident model and job queue without any Tk dependency."""
+    from audio.recorder import AudioRecorder
+    from audio.sources import create_source
+    from services.engine import TranscriptionEngine
+    from services.engine_server import create_engine_server
+    from services.local_transcriber import preload_model
+
+    model_dir = patch_runtime_environment()
+    preload_model(model_dir)
+    if args.refine_model:
+        preload_model(model_dir, args.refine_model)
+
+    config = _engine_config(args)
+    config.enable_hotkeys = not args.no_hotkeys
+    config.copy_to_clipboard = not args.no_clipboard
+    engine = TranscriptionEngine(
+        config,
+        recorder=AudioRecorder(source=create_source(args.audio_source, realtime=args.realtime)),
+    )
+    engine.start()
+
+    server = create_engine_server(engine, port=args.port)
+    # Treat SIGTERM like Ctrl+C so the cleanup below always runs.
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    print(f"VoiceToType daemon listening on {server.server_address}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        engine.stop()
+
+
+def run_gui(args: argparse.Namespace) -> None:
+    # Tk is only imported for the windowed front-end.
+    from tkinter import messagebox, Tk
+
+    from ui.main_window import VoiceToTypeApp
 
-def main() -> None:
     model_dir = patch_runtime_environment()
 
     instance_manager = SingleInstanceManager()
@@ -24,20 +175,36 @@ def main() -> None:
 
     root = Tk()
 
-    # Load model from local whisper_model folder at startup.
-    try:
-        preload_model(model_dir)
-    except LocalTranscriberError:
-        pass
-    except Exception as exc:
-        messagebox.showerror(
-            "Whisper 模型載入失敗",
-            "無法從本機 whisper_model 載入 base 模型。\n"
-            "請確認打包時已包含 whisper_model/base.pt 與 ffmpeg 資源。\n"
-            f"詳細錯誤：{exc}",
+    # A running daemon already holds the model: act as a thin client and share it.
+    client = EngineClient(port=args.port)
+    if client.is_available():
+        engine = RemoteEngine(client)
+    else:
+        # Whisper/torch are only imported when this process hosts the engine itself.
+        from services.engine import TranscriptionEngine
+        from services.local_transcriber import LocalTranscriberError, preload_model
+
+        # Load model from local whisper_model folder at startup.
+        try:
+            preload_model(model_dir)
+            if args.refine_model:
+                preload_model(model_dir, args.refine_model)
+        except LocalTranscriberError:
+            pass
+        except Exception as exc:
+            messagebox.showerror(
+                "Whisper 模型載入失敗",
+                "無法從本機 whisper_model 載入 base 模型。\n"
+                "請確認打包時已包含 whisper_model/base.pt 與 ffmpeg 資源。\n"
+                f"詳細錯誤：{exc}",
+            )
+        engine = TranscriptionEngine(
+            _engine_config(args),
+            # Tk already holds a display connection; reuse it instead of spawning xclip.
+            clipboard_backend=create_clipboard_backend(root),
         )
 
-    app = VoiceToTypeApp(root)
+    app = VoiceToTypeApp(root, engine)
 
     # When another process instance starts, wake this window.
     instance_manager.start_listener(lambda: root.after(0, app.show_window))
@@ -50,5 +217,15 @@ def main() -> None:
     root.mainloop()
 
 
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    if args.startup_probe is not None:
+        run_startup_probe(args.startup_probe)
+    elif args.headless:
+        run_daemon(args)
+    else:
+        run_gui(args)
+
+
 if __name__ == "__main__":
     main()
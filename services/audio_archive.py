@@ -0,0 +1,198 @@
+"""Opt-in compressed archive of recordings, linked to history entries by ``entry_id``."""
+
+from __future__ import annotations
+
+import queue
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+
+class AudioArchiveError(Exception):
+    """Raised when a clip cannot be encoded into the archive."""
+
+
+@dataclass(frozen=True)
+class ArchiveConfig:
+    """Codec and retention bounds for archived clips."""
+
+    codec: str = "flac"
+    max_bytes: int = 500 * 1024 * 1024
+    max_age_days: float = 30.0
+
+
+# codec -> (file suffix, ffmpeg container, ffmpeg encoder arguments)
+_CODECS = {
+    "flac": (".flac", "flac", ["-c:a", "flac"]),
+    "opus": (".opus", "ogg", ["-c:a", "libopus", "-b:a", "24k"]),
+}
+
+# Keep the windowed EXE from flashing a console for every ffmpeg run.
+_SUBPROCESS_FLAGS = subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0
+
+
+@dataclass
+class _ArchiveJob:
+    entry_id: str
+    audio: Path | np.ndarray
+    sample_rate: int
+    channels: int
+    delete_source: bool
+
+
+class AudioArchive:
+    """Encode clips with the bundled ffmpeg on a background thread and enforce retention.
+
+    Retention also runs when the archive starts and then hourly while idle, so
+    ``max_age_days`` applies even when nothing new is recorded.
+    """
+
+    RETENTION_INTERVAL_SECONDS = 3600.0
+
+    def __init__(self, root: Path, config: ArchiveConfig | None = None) -> None:
+        self.root = root
+        self.config = config or ArchiveConfig()
+        self._jobs: queue.Queue[_ArchiveJob | None] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._worker_loop, name="audio-archive", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._jobs.put(None)
+            self._thread = None
+
+    def submit(
+        self,
+        entry_id: str,
+        audio: Path | np.ndarray,
+        sample_rate: int = 16000,
+        channels: int = 1,
+        delete_source: bool = False,
+    ) -> None:
+        """Queue a clip for encoding; returns immediately so the caller stays off the slow path."""
+        self._jobs.put(_ArchiveJob(entry_id, audio, sample_rate, channels, delete_source))
+
+    def path_for(self, entry_id: str) -> Path | None:
+        """Return the archived clip for an entry, if one exists."""
+        if not entry_id or not self.root.exists():
+            return None
+        for suffix, _, _ in _CODECS.values():
+            candidate = self.root / f"{entry_id}{suffix}"
+            if candidate.exists():
+                return candidate
+        return None
+
+    def delete(self, entry_id: str) -> None:
+        with self._lock:
+            path = self.path_for(entry_id)
+            if path is not None:
+                path.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            for path in self._archived_files():
+                path.unlink(missing_ok=True)
+
+    def enforce_retention(self) -> None:
+        """Drop clips older than ``max_age_days``, then the oldest until under ``max_bytes``."""
+        with self._lock:
+            cutoff = time.time() - self.config.max_age_days * 86400
+            files = []
+            for path in self._archived_files():
+                stat = path.stat()
+                if stat.st_mtime < cutoff:
+                    path.unlink(missing_ok=True)
+                else:
+                    files.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in files)
+            for _, size, path in sorted(files):
+                if total <= self.config.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+
+    def remove_partial_files(self) -> None:
+        """Delete ``.part`` files left behind by an encode that was interrupted."""
+        with self._lock:
+            if self.root.exists():
+                for path in self.root.glob("*.part"):
+                    path.unlink(missing_ok=True)
+
+    def _archived_files(self) -> list[Path]:
+        if not self.root.exists():
+            return []
+        suffixes = {suffix for suffix, _, _ in _CODECS.values()}
+        return [path for path in self.root.iterdir() if path.suffix in suffixes]
+
+    def _worker_loop(self) -> None:
+        # Only this thread encodes, so any .part present before it starts is stale.
+        try:
+            self.remove_partial_files()
+            self.enforce_retention()
+        except OSError:  # pragma: no cover - cleanup is best-effort
+            pass
+        while True:
+            try:
+                job = self._jobs.get(timeout=self.RETENTION_INTERVAL_SECONDS)
+            except queue.Empty:
+                try:
+                    self.enforce_retention()
+                except OSError:  # pragma: no cover
+                    pass
+                continue
+            if job is None:
+                return
+            try:
+                self._encode(job)
+                self.enforce_retention()
+            except Exception:  # pragma: no cover - one bad clip must not stop the archive thread
+                # Archiving is best-effort; the transcript is already saved.
+                pass
+            finally:
+                if job.delete_source and isinstance(job.audio, Path):
+                    job.audio.unlink(missing_ok=True)
+
+    def _encode(self, job: _ArchiveJob) -> None:
+        # Imported lazily: only needed once archiving is actually enabled.
+        import imageio_ffmpeg
+
+        if self.config.codec not in _CODECS:
+            raise AudioArchiveError(f"Unsupported archive codec: {self.config.codec}")
+        suffix, container, codec_args = _CODECS[self.config.codec]
+        target = self.root / f"{job.entry_id}{suffix}"
+        partial = target.with_name(target.name + ".part")
+
+        command = [imageio_ffmpeg.get_ffmpeg_exe(), "-hide_banner", "-loglevel", "error", "-y"]
+        stdin_bytes = None
+        if isinstance(job.audio, Path):
+            command += ["-i", str(job.audio)]
+        else:
+            # Stream raw PCM through stdin instead of writing a temp WAV first.
+            command += ["-f", "s16le", "-ar", str(job.sample_rate), "-ac", str(job.channels), "-i", "pipe:0"]
+            stdin_bytes = job.audio.astype(np.int16, copy=False).tobytes()
+        command += codec_args + ["-f", container, str(partial)]
+
+        completed = subprocess.run(
+            command,
+            input=stdin_bytes,
+            capture_output=True,
+            check=False,
+            creationflags=_SUBPROCESS_FLAGS,
+        )
+        if completed.returncode != 0:
+            partial.unlink(missing_ok=True)
+            raise AudioArchiveError(completed.stderr.decode("utf-8", errors="replace").strip())
+        partial.replace(target)
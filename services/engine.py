@@ -0,0 +1,376 @@
+"""Tk-free transcription engine shared by the desktop UI and the headless daemon."""
+
+from __future__ import annotations
+
+import queue
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+from audio.recorder import AudioRecorder, AudioRecorderError
+from services.audio_archive import ArchiveConfig
+from services.engine_events import EngineError, EngineEvent, EngineStatus
+from services.history_manager import HistoryManager
+from services.local_transcriber import (
+    DEFAULT_MODEL_NAME,
+    LocalTranscriberError,
+    RefineConfig,
+    get_memory_stats,
+    prewarm_models,
+    start_idle_eviction,
+    stop_idle_eviction,
+    transcribe_detailed,
+)
+from services.text_cleaner import clean_text
+from services.text_delivery import (
+    TextDeliveryBackend,
+    TextDeliveryService,
+    TypingBackend,
+    create_clipboard_backend,
+)
+
+
+@dataclass
+class EngineConfig:
+    """Runtime switches for the engine host process."""
+
+    hotkey: str = "right alt"
+    # "toggle" (press to start/stop) or "hold" (push-to-talk).
+    hotkey_mode: str = "toggle"
+    # Discard-recording chord; empty (the default) disables it.
+    cancel_hotkey: str = ""
+    enable_hotkeys: bool = True
+    copy_to_clipboard: bool = True
+    # Also type each result into the focused window (chunked, rate-limited).
+    type_into_window: bool = False
+    typing_chars_per_second: float = 400.0
+    keep_segments: bool = False
+    word_timestamps: bool = False
+    # Larger model used to re-decode low-confidence segments; empty disables the second pass.
+    refine_model: str = ""
+    # Compressed copy of every recording linked to its history entry; None keeps the old delete-after behaviour.
+    archive: ArchiveConfig | None = None
+    # Unload resident models after this many idle minutes; 0 keeps them loaded forever.
+    model_idle_minutes: float = 0.0
+
+
+@dataclass
+class TranscriptionJob:
+    """One queued clip (file path or in-memory samples) waiting for the worker thread."""
+
+    audio: Path | np.ndarray
+    delete_after: bool = True
+    # Set when re-transcribing an archived clip: update this entry instead of adding one.
+    entry_id: str = ""
+    model_name: str = ""
+    future: Future = field(default_factory=Future)
+
+
+EventListener = Callable[[EngineEvent], None]
+
+
+class TranscriptionEngine:
+    """Own recorder, hotkeys and a single transcription worker fed by a job queue."""
+
+    def __init__(
+        self,
+        config: EngineConfig | None = None,
+        recorder: AudioRecorder | None = None,
+        history_manager: HistoryManager | None = None,
+        clipboard_backend: TextDeliveryBackend | None = None,
+    ) -> None:
+        self.config = config or EngineConfig()
+        self.recorder = recorder or AudioRecorder()
+        self.history_manager = history_manager or HistoryManager()
+        self._clipboard_backend = clipboard_backend
+        self.delivery: TextDeliveryService | None = None
+
+        self._listeners: list[EventListener] = []
+        self._listeners_lock = threading.Lock()
+        self._emit_lock = threading.RLock()
+        self._record_lock = threading.Lock()
+        self._jobs: queue.Queue[TranscriptionJob | None] = queue.Queue()
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self._last_status = EngineStatus.IDLE
+        self._worker: threading.Thread | None = None
+        self._hotkey_manager = None
+
+    @property
+    def status(self) -> EngineStatus:
+        if self.recorder.is_recording:
+            return EngineStatus.RECORDING
+        with self._pending_lock:
+            if self._pending:
+                return EngineStatus.PROCESSING
+        return self._last_status
+
+    def add_listener(self, listener: EventListener) -> None:
+        with self._listeners_lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: EventListener) -> None:
+        with self._listeners_lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def start(self) -> None:
+        """Start the worker thread and, if enabled, the global hotkey listener."""
+        start_idle_eviction(self.config.model_idle_minutes * 60)
+
+        if self.config.archive is not None:
+            self.history_manager.audio_archive.config = self.config.archive
+            self.history_manager.audio_archive.start()
+
+        if self.delivery is None:
+            self.delivery = TextDeliveryService(self._build_delivery_backends(), on_error=self._on_delivery_error)
+            self.delivery.start()
+
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._worker_loop, name="transcription-worker", daemon=True)
+            self._worker.start()
+
+        if self.config.enable_hotkeys and self._hotkey_manager is None:
+            # pynput needs a display server, so only import it when hotkeys are wanted.
+            from services.hotkey_manager import HotkeyConfig, HotkeyManager
+
+            # Callbacks run on the hotkey control thread, never on the pynput listener.
+            self._hotkey_manager = HotkeyManager(
+                on_toggle=self.toggle_recording,
+                on_start=self.start_recording,
+                on_stop=self.stop_recording,
+                on_cancel=self.cancel_recording,
+                config=HotkeyConfig(
+                    raw_value=self.config.hotkey,
+                    mode=self.config.hotkey_mode,
+                    cancel_value=self.config.cancel_hotkey,
+                ),
+            )
+            self._hotkey_manager.start()
+
+    def stop(self) -> None:
+        """Stop hotkeys and let the worker exit after the current job."""
+        if self._hotkey_manager is not None:
+            self._hotkey_manager.stop()
+            self._hotkey_manager = None
+        if self._worker is not None:
+            self._jobs.put(None)
+            self._worker = None
+        if self.delivery is not None:
+            self.delivery.stop()
+            self.delivery = None
+        self.history_manager.audio_archive.stop()
+        stop_idle_eviction()
+
+    def _build_delivery_backends(self) -> list[TextDeliveryBackend]:
+        backends: list[TextDeliveryBackend] = []
+        if self.config.copy_to_clipboard:
+            backends.append(self._clipboard_backend or create_clipboard_backend())
+        if self.config.type_into_window:
+            backends.append(
+                TypingBackend(chars_per_second=self.config.typing_chars_per_second, on_typing=self._pause_hotkeys)
+            )
+        return backends
+
+    def _pause_hotkeys(self, paused: bool) -> None:
+        # Typed text would otherwise hit a single-character hotkey and toggle recording.
+        hotkey_manager = self._hotkey_manager
+        if hotkey_manager is not None:
+            hotkey_manager.set_paused(paused)
+
+    def _on_delivery_error(self, backend: TextDeliveryBackend, exc: Exception) -> None:
+        self._emit("delivery_error", message=f"{backend.name}: {exc}")
+
+    def set_hotkey(self, hotkey_text: str) -> None:
+        """Update the recording hotkey; raises ``HotkeyError`` on invalid input."""
+        if self._hotkey_manager is None:
+            raise EngineError("Hotkeys are disabled for this engine.")
+        self._hotkey_manager.set_hotkey(hotkey_text)
+        self.config.hotkey = self._hotkey_manager.config.raw_value
+
+    def toggle_recording(self) -> None:
+        """Start recording on first call, stop and queue the clip on the second."""
+        with self._record_lock:
+            if self.recorder.is_recording:
+                self._stop_recording_locked()
+            else:
+                self._start_recording_locked()
+
+    def start_recording(self) -> None:
+        with self._record_lock:
+            if not self.recorder.is_recording:
+                self._start_recording_locked()
+
+    def stop_recording(self) -> None:
+        with self._record_lock:
+            if self.recorder.is_recording:
+                self._stop_recording_locked()
+
+    def cancel_recording(self) -> None:
+        """Stop recording and discard the clip without transcribing it."""
+        with self._record_lock:
+            if not self.recorder.is_recording:
+                return
+            try:
+                self.recorder.stop_and_collect()
+            except AudioRecorderError:
+                pass
+            self._last_status = EngineStatus.IDLE
+        self._emit("status")
+
+    def submit_file(self, audio_path: Path, delete_after: bool = False) -> Future:
+        """Queue an existing audio file; the future resolves to the cleaned text."""
+        return self._submit(TranscriptionJob(audio=audio_path, delete_after=delete_after))
+
+    def submit_samples(self, samples: np.ndarray) -> Future:
+        """Queue in-memory PCM samples without a temp-file round trip."""
+        return self._submit(TranscriptionJob(audio=samples, delete_after=False))
+
+    def memory_stats(self) -> dict:
+        """RSS and model residency of this process (see ``get_memory_stats``)."""
+        return get_memory_stats()
+
+    @property
+    def retranscribe_model(self) -> str:
+        """Model used to re-transcribe archived clips; empty when none differs from the live model."""
+        refine_model = self.config.refine_model
+        return refine_model if refine_model and refine_model != DEFAULT_MODEL_NAME else ""
+
+    def retranscribe(self, entry_id: str, model_name: str = "") -> Future:
+        """Decode an archived clip again (by default with the refine model) and update its entry."""
+        if not self.retranscribe_model:
+            # Decoding the same audio with the same model would just reproduce the stored text.
+            raise EngineError("No second model is configured for re-transcription (see --refine-model).")
+        model_name = model_name or self.retranscribe_model
+        # Any other name could trigger an arbitrary model download.
+        if model_name != self.retranscribe_model:
+            raise EngineError(f"Model is not enabled on this engine: {model_name}")
+        audio_path = self.history_manager.audio_archive.path_for(entry_id)
+        if audio_path is None:
+            raise EngineError("No archived audio for this history entry.")
+        job = TranscriptionJob(
+            audio=audio_path,
+            delete_after=False,
+            entry_id=entry_id,
+            model_name=model_name,
+        )
+        return self._submit(job)
+
+    def delete_history_entry(self, entry_id: str) -> None:
+        """Delete one history entry and its segments/archived audio."""
+        try:
+            self.history_manager.delete_entry(entry_id)
+        except KeyError as exc:
+            raise EngineError("History entry not found.") from exc
+
+    def clear_history(self) -> None:
+        self.history_manager.delete_all_history()
+
+    def _submit(self, job: TranscriptionJob) -> Future:
+        with self._pending_lock:
+            self._pending += 1
+        # Announce before queueing: once queued, the worker may emit the result first.
+        self._emit("status")
+        self._jobs.put(job)
+        return job.future
+
+    def _start_recording_locked(self) -> None:
+        try:
+            self.recorder.start(on_source_finished=self._on_source_finished)
+        except AudioRecorderError as exc:
+            self._last_status = EngineStatus.ERROR
+            self._emit("record_error", message=str(exc))
+            return
+        # Reload evicted models while the user is still speaking.
+        prewarm_models(self.config.refine_model)
+        self._emit("status")
+
+    def _stop_recording_locked(self) -> None:
+        try:
+            samples = self.recorder.stop_and_collect()
+        except AudioRecorderError as exc:
+            self._last_status = EngineStatus.ERROR
+            self._emit("record_error", message=str(exc))
+            return
+        self.submit_samples(samples)
+
+    def _on_source_finished(self) -> None:
+        # File/pipe input ran dry: finish the clip off the source's reader thread.
+        threading.Thread(target=self.stop_recording, daemon=True).start()
+
+    def _worker_loop(self) -> None:
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+
+            kind, text, entry_id, error = self._process_job(job)
+            with self._pending_lock:
+                self._pending -= 1
+
+            if error is None:
+                self._last_status = EngineStatus.DONE
+                job.future.set_result(text)
+                self._emit(kind, text=text, entry_id=entry_id)
+            else:
+                self._last_status = EngineStatus.ERROR
+                job.future.set_exception(error)
+                self._emit(kind, message=str(error))
+
+    def _process_job(self, job: TranscriptionJob) -> tuple[str, str, str, Exception | None]:
+        """Run transcribe -> clean -> clipboard -> history; return (kind, text, entry_id, error)."""
+        handed_to_archive = False
+        try:
+            if job.model_name:
+                result = transcribe_detailed(
+                    job.audio,
+                    word_timestamps=self.config.word_timestamps,
+                    model_name=job.model_name,
+                )
+            else:
+                refine = RefineConfig(model_name=self.config.refine_model) if self.config.refine_model else None
+                result = transcribe_detailed(job.audio, word_timestamps=self.config.word_timestamps, refine=refine)
+            polished_text = clean_text(result.text)
+            if self.delivery is not None:
+                # Single delivery thread: results reach the user in queue order.
+                self.delivery.deliver(polished_text)
+
+            kept = result if self.config.keep_segments else None
+            if job.entry_id:
+                entry = self.history_manager.update_entry(job.entry_id, polished_text, kept)
+            else:
+                entry = self.history_manager.add_entry(polished_text, kept)
+                if self.config.archive is not None:
+                    # Encoding runs on the archive thread; it also owns deleting the source file.
+                    self.history_manager.audio_archive.submit(
+                        entry.entry_id,
+                        job.audio,
+                        sample_rate=self.recorder.config.sample_rate,
+                        channels=self.recorder.config.channels,
+                        delete_source=job.delete_after,
+                    )
+                    handed_to_archive = True
+            return "result", polished_text, entry.entry_id, None
+        except LocalTranscriberError as exc:
+            return "transcribe_error", "", "", exc
+        except Exception as exc:  # pragma: no cover - broad fallback for runtime safety
+            return "process_error", "", "", exc
+        finally:
+            if job.delete_after and not handed_to_archive and isinstance(job.audio, Path):
+                job.audio.unlink(missing_ok=True)
+
+    def _emit(self, kind: str, text: str = "", message: str = "", entry_id: str = "") -> None:
+        # Sample the status and deliver under one lock so no listener sees an older status after a newer one.
+        with self._emit_lock:
+            event = EngineEvent(kind=kind, status=self.status, text=text, message=message, entry_id=entry_id)
+            with self._listeners_lock:
+                listeners = list(self._listeners)
+            for listener in listeners:
+                try:
+                    listener(event)
+                except Exception:  # pragma: no cover - one bad front-end must not stop the rest
+                    continue
@@ -0,0 +1,252 @@
+"""Thin client for the headless engine daemon (see ``services.engine_server``).
+
+Only imports the shared event types, so the Tk window can attach to a running
+daemon without loading Whisper or torch itself.
+
+The channel is private to the user who started the daemon: on POSIX it is a
+Unix socket inside a 0700 directory; on Windows (no ``AF_UNIX`` in CPython)
+it is a loopback TCP port and every request carries a token that only that
+user can read.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sys
+import threading
+from pathlib import Path
+from typing import Callable
+
+from services.engine_events import EngineError, EngineEvent, EngineStatus
+from services.history_manager import HistoryManager
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 47654
+
+USE_UNIX_SOCKET = hasattr(socket, "AF_UNIX") and sys.platform != "win32"
+RUNTIME_DIR = Path.home() / ".voicetotype" / "run"
+SOCKET_PATH = RUNTIME_DIR / "daemon.sock"
+TOKEN_FILE = RUNTIME_DIR / "daemon.token"
+
+
+class EngineClientError(Exception):
+    """Raised when the daemon is unreachable or rejects a command."""
+
+
+def encode_message(payload: dict) -> bytes:
+    return (json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def event_to_dict(event: EngineEvent) -> dict:
+    return {
+        "event": event.kind,
+        "status": event.status.value,
+        "text": event.text,
+        "message": event.message,
+        "entry_id": event.entry_id,
+    }
+
+
+def event_from_dict(data: dict) -> EngineEvent:
+    return EngineEvent(
+        kind=data["event"],
+        status=EngineStatus(data.get("status", EngineStatus.IDLE.value)),
+        text=data.get("text", ""),
+        message=data.get("message", ""),
+        entry_id=data.get("entry_id", ""),
+    )
+
+
+def prepare_runtime_dir() -> Path:
+    """Create the per-user directory for the daemon socket/token, readable by its owner only."""
+    RUNTIME_DIR.mkdir(parents=True, exist_ok=True)
+    os.chmod(RUNTIME_DIR, 0o700)
+    return RUNTIME_DIR
+
+
+def write_private_file(path: Path, text: str) -> None:
+    """Write ``text`` to a file created with mode 0600."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    # os.open only applies the mode to new files; tighten a leftover one as well.
+    os.chmod(path, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as handle:
+        handle.write(text)
+
+
+class EngineClient:
+    """Talk to a running daemon; used by the GUI and by scripts."""
+
+    def __init__(
+        self,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        timeout: float = 1.0,
+        socket_path: Path = SOCKET_PATH,
+        token_file: Path = TOKEN_FILE,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.socket_path = socket_path
+        self.token_file = token_file
+
+    def is_available(self) -> bool:
+        try:
+            return bool(self.request("ping").get("ok"))
+        except EngineClientError:
+            return False
+
+    def request(self, command: str, timeout: float | None = None, **params) -> dict:
+        """Send one command and return the decoded reply."""
+        payload = {"cmd": command, **params}
+        try:
+            with self._connect(timeout or self.timeout) as conn:
+                conn.sendall(encode_message(self._authenticate(payload)))
+                with conn.makefile("rb") as reader:
+                    line = reader.readline()
+        except OSError as exc:
+            raise EngineClientError("VoiceToType daemon is not reachable.") from exc
+
+        if not line:
+            raise EngineClientError("VoiceToType daemon closed the connection.")
+        reply = json.loads(line.decode("utf-8"))
+        if not reply.get("ok"):
+            raise EngineClientError(str(reply.get("error", "Unknown daemon error.")))
+        return reply
+
+    def subscribe(self, on_event: Callable[[EngineEvent], None]) -> socket.socket:
+        """Open an event stream; ``on_event`` runs on a background reader thread."""
+        try:
+            conn = self._connect(self.timeout)
+        except OSError as exc:
+            raise EngineClientError("VoiceToType daemon is not reachable.") from exc
+        try:
+            conn.sendall(encode_message(self._authenticate({"cmd": "subscribe"})))
+            conn.settimeout(None)
+        except OSError as exc:
+            conn.close()
+            raise EngineClientError("VoiceToType daemon is not reachable.") from exc
+
+        def _reader() -> None:
+            with conn.makefile("rb") as reader:
+                for raw_line in reader:
+                    try:
+                        data = json.loads(raw_line.decode("utf-8"))
+                    except ValueError:
+                        continue
+                    if "event" not in data:
+                        continue
+                    on_event(event_from_dict(data))
+
+        threading.Thread(target=_reader, name="engine-subscriber", daemon=True).start()
+        return conn
+
+    def _connect(self, timeout: float) -> socket.socket:
+        if not USE_UNIX_SOCKET:
+            return socket.create_connection((self.host, self.port), timeout=timeout)
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        conn.settimeout(timeout)
+        try:
+            conn.connect(str(self.socket_path))
+        except OSError:
+            conn.close()
+            raise
+        return conn
+
+    def _authenticate(self, payload: dict) -> dict:
+        if USE_UNIX_SOCKET:
+            # The socket directory is 0700, so reaching the socket already proves the caller.
+            return payload
+        # A missing or unreadable token means no daemon for this user (or a foreign one).
+        return {**payload, "token": self.token_file.read_text(encoding="utf-8").strip()}
+
+
+class RemoteEngine:
+    """Engine-shaped adapter that forwards UI actions to a running daemon."""
+
+    def __init__(self, client: EngineClient | None = None) -> None:
+        self.client = client or EngineClient()
+        # Read-only view of the daemon's history files; every change goes through a daemon command.
+        self.history_manager = HistoryManager()
+        self._listeners: list[Callable[[EngineEvent], None]] = []
+        self._connection: socket.socket | None = None
+        self._retranscribe_model: str | None = None
+
+    @property
+    def status(self) -> EngineStatus:
+        try:
+            return EngineStatus(self.client.request("status")["status"])
+        except EngineClientError:
+            return EngineStatus.ERROR
+
+    @property
+    def retranscribe_model(self) -> str:
+        """The daemon's re-transcription model (fixed for its lifetime, so asked once)."""
+        if self._retranscribe_model is None:
+            try:
+                self._retranscribe_model = str(self.client.request("status").get("retranscribe_model", ""))
+            except EngineClientError:
+                return ""
+        return self._retranscribe_model
+
+    def memory_stats(self) -> dict:
+        """RSS and model residency of the daemon, which is where the models live."""
+        try:
+            reply = self.client.request("memory")
+        except EngineClientError as exc:
+            raise EngineError(str(exc)) from exc
+        reply.pop("ok", None)
+        return reply
+
+    def add_listener(self, listener: Callable[[EngineEvent], None]) -> None:
+        self._listeners.append(listener)
+
+    def start(self) -> None:
+        if self._connection is None:
+            self._connection = self.client.subscribe(self._dispatch)
+
+    def stop(self) -> None:
+        if self._connection is not None:
+            try:
+                self._connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._connection.close()
+            self._connection = None
+
+    def toggle_recording(self) -> None:
+        try:
+            self.client.request("toggle")
+        except EngineClientError as exc:
+            self._dispatch(EngineEvent(kind="record_error", status=EngineStatus.ERROR, message=str(exc)))
+
+    def set_hotkey(self, hotkey_text: str) -> None:
+        try:
+            self.client.request("set_hotkey", hotkey=hotkey_text)
+        except EngineClientError as exc:
+            raise EngineError(str(exc)) from exc
+
+    def retranscribe(self, entry_id: str, model_name: str = "") -> None:
+        """Queue re-transcription on the daemon; the result arrives as a normal event."""
+        try:
+            self.client.request("retranscribe", entry_id=entry_id, model=model_name)
+        except EngineClientError as exc:
+            raise EngineError(str(exc)) from exc
+
+    def delete_history_entry(self, entry_id: str) -> None:
+        try:
+            self.client.request("delete_entry", entry_id=entry_id)
+        except EngineClientError as exc:
+            raise EngineError(str(exc)) from exc
+
+    def clear_history(self) -> None:
+        try:
+            self.client.request("clear_history")
+        except EngineClientError as exc:
+            raise EngineError(str(exc)) from exc
+
+    def _dispatch(self, event: EngineEvent) -> None:
+        for listener in list(self._listeners):
+            listener(event)
@@ -0,0 +1,37 @@
+"""Engine status and event types shared by the engine, the daemon and its thin clients.
+
+Kept free of Whisper/torch imports so a Tk window talking to a running daemon
+starts without loading the speech stack.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from enum import Enum
+
+
+class EngineError(Exception):
+    """Raised when an engine command cannot be executed."""
+
+
+class EngineStatus(str, Enum):
+    IDLE = "idle"
+    RECORDING = "recording"
+    PROCESSING = "processing"
+    DONE = "done"
+    ERROR = "error"
+
+
+@dataclass(frozen=True)
+class EngineEvent:
+    """Notification pushed to every registered front-end.
+
+    ``kind`` is one of ``status``, ``result``, ``record_error``,
+    ``transcribe_error``, ``process_error`` or ``delivery_error``.
+    """
+
+    kind: str
+    status: EngineStatus
+    text: str = ""
+    message: str = ""
+    entry_id: str = ""
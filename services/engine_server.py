@@ -0,0 +1,229 @@
+"""Local JSON-lines control channel for the headless engine daemon.
+
+One request per line, one JSON reply per line.  ``subscribe`` keeps the
+connection open and streams every ``EngineEvent`` as it happens, which is how
+the Tk window acts as a thin client of a running daemon; the client side lives
+in ``services.engine_client``.
+"""
+
+from __future__ import annotations
+
+import hmac
+import json
+import queue
+import secrets
+import socket
+import socketserver
+import threading
+from pathlib import Path
+
+from services.engine import TranscriptionEngine
+from services.engine_client import (
+    DEFAULT_HOST,
+    DEFAULT_PORT,
+    SOCKET_PATH,
+    TOKEN_FILE,
+    USE_UNIX_SOCKET,
+    encode_message,
+    event_to_dict,
+    prepare_runtime_dir,
+    write_private_file,
+)
+from services.engine_events import EngineError, EngineEvent
+
+# Events a subscriber may fall behind by before it is disconnected.
+SUBSCRIBER_BACKLOG = 256
+
+
+class _EngineRequestHandler(socketserver.StreamRequestHandler):
+    server: "_EngineDispatcher"
+
+    def handle(self) -> None:
+        for raw_line in self.rfile:
+            try:
+                request = json.loads(raw_line.decode("utf-8"))
+                command = str(request.get("cmd", ""))
+            except (UnicodeDecodeError, ValueError, AttributeError):
+                self._reply({"ok": False, "error": "Malformed request."})
+                continue
+
+            if not self.server.is_authorized(request):
+                self._reply({"ok": False, "error": "Unauthorized."})
+                return
+
+            if command == "subscribe":
+                self._stream_events()
+                return
+
+            try:
+                reply = self.server.dispatch(command, request)
+            except Exception as exc:
+                reply = {"ok": False, "error": str(exc)}
+            if not self._reply(reply):
+                return
+
+    def _reply(self, payload: dict) -> bool:
+        try:
+            self.wfile.write(encode_message(payload))
+            self.wfile.flush()
+            return True
+        except OSError:
+            return False
+
+    def _stream_events(self) -> None:
+        # The engine calls listeners under its emit lock, so _forward only queues;
+        # this handler thread does the (possibly slow) socket writes.
+        events: queue.Queue[dict | None] = queue.Queue(maxsize=SUBSCRIBER_BACKLOG)
+
+        def _forward(event: EngineEvent) -> None:
+            try:
+                events.put_nowait(event_to_dict(event))
+            except queue.Full:
+                # The peer stopped reading; unblock the pending write and drop it.
+                self._hang_up()
+
+        def _watch_peer() -> None:
+            try:
+                while self.request.recv(1024):
+                    pass
+            except OSError:
+                pass
+            try:
+                events.put_nowait(None)
+            except queue.Full:
+                self._hang_up()
+
+        engine = self.server.engine
+        engine.add_listener(_forward)
+        try:
+            threading.Thread(target=_watch_peer, name="engine-subscriber-peer", daemon=True).start()
+            if not self._reply({"ok": True, "status": engine.status.value}):
+                return
+            while True:
+                payload = events.get()
+                if payload is None or not self._reply(payload):
+                    break
+        finally:
+            engine.remove_listener(_forward)
+
+    def _hang_up(self) -> None:
+        try:
+            self.request.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+class _EngineDispatcher:
+    """Command handling shared by the Unix-socket and the token-protected TCP server."""
+
+    engine: TranscriptionEngine
+    token: str | None = None
+
+    def is_authorized(self, request: dict) -> bool:
+        if self.token is None:
+            return True
+        return hmac.compare_digest(str(request.get("token", "")), self.token)
+
+    def dispatch(self, command: str, request: dict) -> dict:
+        engine = self.engine
+        if command == "ping":
+            return {"ok": True}
+        if command == "status":
+            return {"ok": True, "status": engine.status.value, "retranscribe_model": engine.retranscribe_model}
+        if command == "memory":
+            return {"ok": True, **engine.memory_stats()}
+        if command == "toggle":
+            engine.toggle_recording()
+        elif command == "start":
+            engine.start_recording()
+        elif command == "stop":
+            engine.stop_recording()
+        elif command == "cancel":
+            engine.cancel_recording()
+        elif command == "set_hotkey":
+            engine.set_hotkey(str(request.get("hotkey", "")))
+        elif command == "transcribe":
+            path = Path(str(request.get("path", "")))
+            if not path.is_file():
+                raise EngineError(f"Audio file not found: {path}")
+            text = engine.submit_file(path).result()
+            return {"ok": True, "text": text}
+        elif command == "delete_entry":
+            engine.delete_history_entry(str(request.get("entry_id", "")))
+        elif command == "clear_history":
+            engine.clear_history()
+        elif command == "retranscribe":
+            engine.retranscribe(str(request.get("entry_id", "")), str(request.get("model", "")))
+        else:
+            return {"ok": False, "error": f"Unknown command: {command}"}
+        return {"ok": True, "status": engine.status.value}
+
+
+class UnixEngineServer(_EngineDispatcher, socketserver.ThreadingTCPServer):
+    """Serve engine commands on a Unix socket inside the per-user 0700 runtime directory."""
+
+    daemon_threads = True
+
+    def __init__(self, engine: TranscriptionEngine, socket_path: Path = SOCKET_PATH) -> None:
+        # socketserver only defines its Unix classes where AF_UNIX exists, so pick the family here.
+        self.address_family = socket.AF_UNIX
+        self.engine = engine
+        self.socket_path = socket_path
+        prepare_runtime_dir()
+        self._remove_stale_socket()
+        super().__init__(str(socket_path), _EngineRequestHandler)
+
+    def _remove_stale_socket(self) -> None:
+        if not self.socket_path.exists():
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(self.socket_path))
+        except OSError:
+            # Left behind by a daemon that did not shut down cleanly.
+            self.socket_path.unlink(missing_ok=True)
+        else:
+            raise OSError(f"A VoiceToType daemon is already listening on {self.socket_path}")
+        finally:
+            probe.close()
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.socket_path.unlink(missing_ok=True)
+
+
+class TcpEngineServer(_EngineDispatcher, socketserver.ThreadingTCPServer):
+    """Serve engine commands on a loopback port; each request must carry the token from ``TOKEN_FILE``."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        engine: TranscriptionEngine,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        token_file: Path = TOKEN_FILE,
+    ) -> None:
+        self.engine = engine
+        self.token_file = token_file
+        super().__init__((host, port), _EngineRequestHandler)
+        self.token = secrets.token_hex(32)
+        prepare_runtime_dir()
+        write_private_file(token_file, self.token)
+
+    def server_bind(self) -> None:
+        # Stop another local user from binding the same port and collecting the token.
+        if hasattr(socket, "SO_EXCLUSIVEADDRUSE"):
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+        super().server_bind()
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.token_file.unlink(missing_ok=True)
+
+
+def create_engine_server(engine: TranscriptionEngine, port: int = DEFAULT_PORT) -> socketserver.BaseServer:
+    """Bind the control channel for this platform: Unix socket on POSIX, token-checked TCP on Windows."""
+    if USE_UNIX_SOCKET:
+        return UnixEngineServer(engine)
+    return TcpEngineServer(engine, port=port)
@@ -3,10 +3,17 @@
 from __future__ import annotations
 
 import json
+import os
+import tempfile
+import threading
+import uuid
 from dataclasses import asdict, dataclass
 from datetime import datetime
 from pathlib import Path
 
+from services.audio_archive import AudioArchive
+from services.segment_store import SegmentStore, TranscriptionResult, TranscriptSegment
+
 
 @dataclass
 class HistoryEntry:
@@ -14,16 +21,30 @@ class HistoryEntry:
 
     timestamp: str
     text: str
+    entry_id: str = ""
+    has_segments: bool = False
 
 
 class HistoryManager:
-    """Manage JSON-based history with CRUD-style helpers."""
+    """Manage JSON-based history with CRUD-style helpers.
+
+    Segment metadata is kept out of history.json in a sibling
+    ``segments.bin`` of packed records keyed by ``entry_id``; archived audio
+    lives in ``archive/`` under the same key.
+
+    Every read-modify-write runs under one lock, so a process should share a
+    single instance (the Tk window reuses the engine's); a thin client never
+    writes and sends changes to the daemon instead.
+    """
 
     def __init__(self, history_file: Path | None = None, max_entries: int = 100) -> None:
         default_path = Path.home() / ".voicetotype" / "history.json"
         self.history_file = history_file or default_path
         self.max_entries = max_entries
         self.history_file.parent.mkdir(parents=True, exist_ok=True)
+        self.segment_store = SegmentStore(self.history_file.parent / "segments.bin")
+        self.audio_archive = AudioArchive(self.history_file.parent / "archive")
+        self._lock = threading.RLock()
 
     def load_history(self) -> list[HistoryEntry]:
         """Load all entries from history.json."""
@@ -32,33 +53,103 @@ class HistoryManager:
 
         try:
             raw_data = json.loads(self.history_file.read_text(encoding="utf-8"))
-            return [HistoryEntry(**item) for item in raw_data]
+            entries = [HistoryEntry(**item) for item in raw_data]
         except Exception:
             return []
 
+        # Entries written before entry ids existed get one, so they can be deleted by id.
+        if any(not entry.entry_id for entry in entries):
+            with self._lock:
+                for entry in entries:
+                    entry.entry_id = entry.entry_id or uuid.uuid4().hex
+                self.save_history(entries)
+        return entries
+
     def save_history(self, entries: list[HistoryEntry]) -> None:
-        """Persist all entries back to history.json."""
-        self.history_file.write_text(
-            json.dumps([asdict(item) for item in entries], ensure_ascii=False, indent=2),
-            encoding="utf-8",
+        """Persist all entries back to history.json.
+
+        The file is replaced atomically through a uniquely named temp file, so
+        readers never see a half-written list.
+        """
+        fd, temp_name = tempfile.mkstemp(
+            dir=self.history_file.parent, prefix=f"{self.history_file.name}.", suffix=".tmp"
         )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump([asdict(item) for item in entries], handle, ensure_ascii=False, indent=2)
+            os.replace(temp_name, self.history_file)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
 
-    def add_entry(self, text: str) -> HistoryEntry:
-        """Insert a new entry at the top of history."""
-        entries = self.load_history()
-        entry = HistoryEntry(timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"), text=text)
-        entries.insert(0, entry)
-        self.save_history(entries[: self.max_entries])
-        return entry
+    def add_entry(self, text: str, result: TranscriptionResult | None = None) -> HistoryEntry:
+        """Insert a new entry at the top of history, optionally with segment metadata."""
+        with self._lock:
+            entries = self.load_history()
+            entry = HistoryEntry(
+                timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                text=text,
+                entry_id=uuid.uuid4().hex,
+                has_segments=bool(result and result.segments),
+            )
+            if entry.has_segments:
+                self.segment_store.save(entry.entry_id, result)
+            entries.insert(0, entry)
+            for dropped in entries[self.max_entries :]:
+                self._delete_attachments(dropped.entry_id)
+            self.save_history(entries[: self.max_entries])
+            return entry
+
+    def update_entry(self, entry_id: str, text: str, result: TranscriptionResult | None = None) -> HistoryEntry:
+        """Replace the text (and segment metadata) of an existing entry, e.g. after re-transcription."""
+        with self._lock:
+            entries = self.load_history()
+            for entry in entries:
+                if entry.entry_id == entry_id:
+                    break
+            else:
+                raise KeyError("History entry not found.")
+
+            entry.text = text
+            entry.has_segments = bool(result and result.segments)
+            if entry.has_segments:
+                self.segment_store.save(entry_id, result)
+            else:
+                self.segment_store.delete(entry_id)
+            self.save_history(entries)
+            return entry
+
+    def load_segments(self, entry_id: str) -> list[TranscriptSegment]:
+        """Load segment metadata for one entry (empty when none was kept)."""
+        return self.segment_store.load(entry_id)
 
     def delete_history_item(self, index: int) -> None:
         """Delete one entry by index in current list order."""
-        entries = self.load_history()
-        if index < 0 or index >= len(entries):
-            raise IndexError("History index out of range.")
-        del entries[index]
-        self.save_history(entries)
+        with self._lock:
+            entries = self.load_history()
+            if index < 0 or index >= len(entries):
+                raise IndexError("History index out of range.")
+            removed = entries.pop(index)
+            self._delete_attachments(removed.entry_id)
+            self.save_history(entries)
+
+    def delete_entry(self, entry_id: str) -> None:
+        """Delete one entry by id, so a concurrent insert cannot shift the target."""
+        with self._lock:
+            entries = self.load_history()
+            remaining = [entry for entry in entries if entry.entry_id != entry_id]
+            if len(remaining) == len(entries):
+                raise KeyError("History entry not found.")
+            self._delete_attachments(entry_id)
+            self.save_history(remaining)
 
     def delete_all_history(self) -> None:
         """Clear all history entries."""
-        self.save_history([])
+        with self._lock:
+            self.save_history([])
+            self.segment_store.prune(set())
+            self.audio_archive.clear()
+
+    def _delete_attachments(self, entry_id: str) -> None:
+        self.segment_store.delete(entry_id)
+        self.audio_archive.delete(entry_id)
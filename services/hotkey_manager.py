@@ -1,9 +1,16 @@
-"""Global hotkey listener using pynput."""
+"""Global hotkey listener using pynput.
+
+The pynput callbacks only enqueue raw key events and return; chord tracking,
+debouncing and the user callbacks run on a dedicated control thread so slow
+work (opening the microphone, encoding audio) never stalls desktop key input.
+"""
 
 from __future__ import annotations
 
+import queue
+import threading
+import time
 from dataclasses import dataclass
-from threading import Lock
 from typing import Callable
 
 from pynput import keyboard
@@ -15,38 +22,90 @@ class HotkeyError(Exception):
 
 @dataclass
 class HotkeyConfig:
-    """Current hotkey metadata."""
+    """Current hotkey metadata.
+
+    ``mode`` is ``toggle`` (press once to start, again to stop) or ``hold``
+    (push-to-talk: record while the chord is held).
+    """
 
     raw_value: str = "right alt"
+    mode: str = "toggle"
+    # Empty disables the cancel chord; a bare global key like esc would fire in every app.
+    cancel_value: str = ""
+    debounce_ms: int = 150
+
+
+# Each chord part matches any of these keys (e.g. alt or alt gr).
+Chord = tuple[frozenset, ...]
+
+
+def _canonical(key: keyboard.Key):  # noqa: ANN202
+    """Form ``Listener.canonical`` reports for ``key``: generic modifiers stay ``Key``, others become vk codes."""
+    if key in (keyboard.Key.alt, keyboard.Key.alt_gr, keyboard.Key.ctrl, keyboard.Key.shift, keyboard.Key.cmd):
+        return key
+    return keyboard.KeyCode.from_vk(key.value.vk)
 
 
 class HotkeyManager:
-    """Monitors global key presses and triggers callback on single key-down events."""
+    """Monitors global key chords and dispatches callbacks off the listener thread."""
 
+    # Listener events are canonicalised (left/right modifiers folded, keys as vk codes),
+    # so aliases are stored in the same canonical form.
     KEY_ALIASES = {
-        "right alt": keyboard.Key.alt_gr,
-        "alt gr": keyboard.Key.alt_gr,
-        "altgr": keyboard.Key.alt_gr,
-        "alt_r": keyboard.Key.alt_gr,
-        "f8": keyboard.Key.f8,
-        "f9": keyboard.Key.f9,
-        "f10": keyboard.Key.f10,
-        "f11": keyboard.Key.f11,
-        "f12": keyboard.Key.f12,
+        "right alt": {_canonical(keyboard.Key.alt_gr)},
+        "alt gr": {_canonical(keyboard.Key.alt_gr)},
+        "altgr": {_canonical(keyboard.Key.alt_gr)},
+        "alt_r": {_canonical(keyboard.Key.alt_gr)},
+        "alt": {_canonical(keyboard.Key.alt), _canonical(keyboard.Key.alt_gr)},
+        "ctrl": {_canonical(keyboard.Key.ctrl)},
+        "shift": {_canonical(keyboard.Key.shift)},
+        "esc": {_canonical(keyboard.Key.esc)},
+        "space": {_canonical(keyboard.Key.space)},
+        "f8": {_canonical(keyboard.Key.f8)},
+        "f9": {_canonical(keyboard.Key.f9)},
+        "f10": {_canonical(keyboard.Key.f10)},
+        "f11": {_canonical(keyboard.Key.f11)},
+        "f12": {_canonical(keyboard.Key.f12)},
     }
-
-    def __init__(self, on_toggle: Callable[[], None], config: HotkeyConfig | None = None) -> None:
+    MODES = ("toggle", "hold")
+    # Synthesized keystrokes reach the hook asynchronously, so presses stay ignored briefly after resuming.
+    RESUME_GRACE_SECONDS = 0.25
+
+    def __init__(
+        self,
+        on_toggle: Callable[[], None],
+        config: HotkeyConfig | None = None,
+        on_start: Callable[[], None] | None = None,
+        on_stop: Callable[[], None] | None = None,
+        on_cancel: Callable[[], None] | None = None,
+    ) -> None:
         self.on_toggle = on_toggle
+        self.on_start = on_start or on_toggle
+        self.on_stop = on_stop or on_toggle
+        self.on_cancel = on_cancel
         self.config = config or HotkeyConfig()
-        self._target_key = self._resolve_key(self.config.raw_value)
+        if self.config.mode not in self.MODES:
+            raise HotkeyError("Unsupported hotkey mode. Try: toggle or hold.")
+        self._chord = self._resolve_chord(self.config.raw_value)
+        self._cancel_chord = self._resolve_chord(self.config.cancel_value) if self.config.cancel_value else ()
         self._listener: keyboard.Listener | None = None
-        self._is_pressed = False
-        self._lock = Lock()
+        self._events: queue.SimpleQueue = queue.SimpleQueue()
+        self._control_thread: threading.Thread | None = None
+        self._paused = False
+        self._resume_at = 0.0
+
+        # Control-thread state only; never touched by the listener callbacks.
+        self._pressed: set = set()
+        self._chord_active = False
+        self._cancel_active = False
+        self._last_trigger = 0.0
 
     def start(self) -> None:
-        """Start the global key listener."""
+        """Start the global key listener and the control thread."""
         if self._listener is not None:
             return
+        self._control_thread = threading.Thread(target=self._control_loop, name="hotkey-control", daemon=True)
+        self._control_thread.start()
         self._listener = keyboard.Listener(on_press=self._on_press, on_release=self._on_release)
         self._listener.start()
 
@@ -56,34 +115,103 @@ class HotkeyManager:
             return
         self._listener.stop()
         self._listener = None
+        self._events.put(None)
+        self._control_thread = None
 
     def set_hotkey(self, hotkey_text: str) -> None:
         """Update hotkey definition at runtime."""
-        key = self._resolve_key(hotkey_text)
-        with self._lock:
-            self._target_key = key
-            self.config.raw_value = hotkey_text.strip().lower()
-            self._is_pressed = False
-
-    def _resolve_key(self, hotkey_text: str):
-        normalized = hotkey_text.strip().lower()
+        chord = self._resolve_chord(hotkey_text)
+        self.config.raw_value = hotkey_text.strip().lower()
+        # Applied on the control thread so chord state is never shared across threads.
+        self._events.put(("rebind", chord, 0.0))
+
+    def set_paused(self, paused: bool) -> None:
+        """Ignore key presses while the app itself is typing, so its own keystrokes never fire a hotkey."""
+        if not paused:
+            self._resume_at = time.monotonic() + self.RESUME_GRACE_SECONDS
+        self._paused = paused
+
+    def _resolve_chord(self, hotkey_text: str) -> Chord:
+        parts = [part.strip().strip("<>") for part in hotkey_text.strip().lower().split("+")]
+        if not all(parts):
+            raise HotkeyError("Unsupported hotkey. Try: right alt, f8-f12, ctrl+alt+r or a single keyboard character.")
+        return tuple(frozenset(self._resolve_key(part)) for part in parts)
+
+    def _resolve_key(self, normalized: str) -> set:
         if normalized in self.KEY_ALIASES:
             return self.KEY_ALIASES[normalized]
 
         if len(normalized) == 1:
-            return keyboard.KeyCode.from_char(normalized)
+            return {keyboard.KeyCode.from_char(normalized)}
 
-        raise HotkeyError(
-            "Unsupported hotkey. Try: right alt, f8-f12, or a single keyboard character."
-        )
+        raise HotkeyError("Unsupported hotkey. Try: right alt, f8-f12, ctrl+alt+r or a single keyboard character.")
 
     def _on_press(self, key) -> None:  # noqa: ANN001
-        with self._lock:
-            if key == self._target_key and not self._is_pressed:
-                self._is_pressed = True
-                self.on_toggle()
+        # Runs on the pynput thread: enqueue and return immediately.
+        at = time.monotonic()
+        # Releases still go through, so keys held before typing started are not left stuck.
+        if self._paused or at < self._resume_at:
+            return
+        self._events.put(("press", self._normalize(key), at))
 
     def _on_release(self, key) -> None:  # noqa: ANN001
-        with self._lock:
-            if key == self._target_key:
-                self._is_pressed = False
+        self._events.put(("release", self._normalize(key), time.monotonic()))
+
+    def _normalize(self, key):  # noqa: ANN001, ANN202
+        """Map raw events to one form per key, so e.g. ``r`` pressed and ``R`` released still pair up."""
+        listener = self._listener
+        if listener is not None:
+            key = listener.canonical(key)
+        # Ctrl+letter may still arrive as a control character; fold it back onto the letter.
+        if isinstance(key, keyboard.KeyCode) and key.char is not None and len(key.char) == 1 and ord(key.char) < 0x20:
+            return keyboard.KeyCode.from_char(chr(ord(key.char) + 0x60))
+        return key
+
+    def _control_loop(self) -> None:
+        while True:
+            event = self._events.get()
+            if event is None:
+                return
+            kind, key, at = event
+            if kind == "rebind":
+                self._chord = key
+                self._chord_active = False
+                continue
+
+            if kind == "press":
+                # OS auto-repeat re-sends key-down; the set coalesces it into one press.
+                self._pressed.add(key)
+            else:
+                self._pressed.discard(key)
+
+            try:
+                self._update_cancel()
+                self._update_chord(at)
+            except Exception:  # pragma: no cover - a failing callback must not kill the dispatcher
+                continue
+
+    def _is_held(self, chord: Chord) -> bool:
+        return bool(chord) and all(self._pressed & alternatives for alternatives in chord)
+
+    def _update_chord(self, at: float) -> None:
+        active = self._is_held(self._chord)
+        if active == self._chord_active:
+            return
+        self._chord_active = active
+
+        if self.config.mode == "hold":
+            if active:
+                self.on_start()
+            else:
+                self.on_stop()
+            return
+
+        if active and (at - self._last_trigger) * 1000 >= self.config.debounce_ms:
+            self._last_trigger = at
+            self.on_toggle()
+
+    def _update_cancel(self) -> None:
+        active = self._is_held(self._cancel_chord)
+        if active and not self._cancel_active and self.on_cancel is not None:
+            self.on_cancel()
+        self._cancel_active = active
@@ -2,21 +2,84 @@
 
 from __future__ import annotations
 
+import ctypes
+import gc
 import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
 from threading import Lock
 
+import numpy as np
 import whisper
 
+from services.segment_store import (
+    HIGH_NO_SPEECH_PROB,
+    LOW_CONFIDENCE_LOGPROB,
+    TranscriptionResult,
+    TranscriptSegment,
+    TranscriptWord,
+)
+
 
 class LocalTranscriberError(Exception):
     """Raised when local Whisper transcription fails."""
 
 
-# Global singleton state: keep one base model in memory for faster repeated usage.
-_MODEL = None
+# Global model cache: keep loaded models in memory for faster repeated usage.
+# Bounded so the fast + refine pair stays resident without growing further.
+_MODELS: OrderedDict[str, object] = OrderedDict()
 _MODEL_LOCK = Lock()
-_MODEL_NAME = "base"
+DEFAULT_MODEL_NAME = "base"
+_MAX_RESIDENT_MODELS = 2
+
+# Idle-eviction bookkeeping: last model use and transcriptions currently running.
+_LAST_USED = time.monotonic()
+_IN_FLIGHT = 0
+_LOADING: set[str] = set()
+_EVICTOR: threading.Thread | None = None
+_EVICTOR_STOP = threading.Event()
+
+_SAMPLE_RATE = 16000
+
+
+@dataclass(frozen=True)
+class RefineConfig:
+    """Second-pass settings: which segments to re-decode and with which model."""
+
+    model_name: str = "small"
+    min_avg_logprob: float = LOW_CONFIDENCE_LOGPROB
+    max_no_speech_prob: float = HIGH_NO_SPEECH_PROB
+    max_compression_ratio: float = 2.4
+    # How much avg_logprob may drop when a repetitive segment is fixed by the re-decode.
+    max_logprob_drop: float = 0.5
+    beam_size: int = 5
+
+    def needs_refinement(self, segment: TranscriptSegment) -> bool:
+        return (
+            segment.avg_logprob < self.min_avg_logprob
+            or segment.no_speech_prob > self.max_no_speech_prob
+            or segment.compression_ratio > self.max_compression_ratio
+        )
+
+    def improves(
+        self, segment: TranscriptSegment, avg_logprob: float, no_speech_prob: float, compression_ratio: float
+    ) -> bool:
+        """Whether a re-decode beats ``segment`` on the metric that made it a target."""
+        if no_speech_prob > segment.no_speech_prob:
+            return False
+        if avg_logprob > segment.avg_logprob:
+            return True
+        # A repetition loop often decodes with high confidence, so its logprob is no
+        # yardstick; accept the re-decode once it stops repeating and stays close.
+        return (
+            segment.compression_ratio > self.max_compression_ratio
+            and compression_ratio <= self.max_compression_ratio
+            and avg_logprob >= segment.avg_logprob - self.max_logprob_drop
+        )
 
 
 def _resolve_model_dir() -> Path:
@@ -25,35 +88,253 @@ def _resolve_model_dir() -> Path:
     return Path(configured)
 
 
-def _get_model():
-    """Load Whisper base model lazily on first use from bundled model directory."""
-    global _MODEL
-    if _MODEL is None:
-        with _MODEL_LOCK:
-            if _MODEL is None:
-                model_dir = _resolve_model_dir()
-                model_dir.mkdir(parents=True, exist_ok=True)
-                # Use local model directory (whisper_model/) so EXE is self-contained.
-                _MODEL = whisper.load_model(_MODEL_NAME, download_root=str(model_dir))
-    return _MODEL
+def _load_model_locked(name: str, model_dir: Path | None = None):
+    """Return a cached model, loading it and evicting the least recently used one if needed."""
+    global _LAST_USED
+    _LAST_USED = time.monotonic()
+    model = _MODELS.get(name)
+    if model is not None:
+        _MODELS.move_to_end(name)
+        return model
+
+    resolved = model_dir or _resolve_model_dir()
+    resolved.mkdir(parents=True, exist_ok=True)
+    while len(_MODELS) >= _MAX_RESIDENT_MODELS:
+        _MODELS.popitem(last=False)
+    _LOADING.add(name)
+    try:
+        # Use local model directory (whisper_model/) so EXE is self-contained.
+        model = whisper.load_model(name, download_root=str(resolved))
+    finally:
+        _LOADING.discard(name)
+    _MODELS[name] = model
+    _LAST_USED = time.monotonic()
+    return model
+
+
+def _get_model(name: str = DEFAULT_MODEL_NAME):
+    """Load a Whisper model lazily on first use from bundled model directory."""
+    with _MODEL_LOCK:
+        return _load_model_locked(name)
 
 
-def preload_model(model_dir: Path | None = None) -> None:
+def preload_model(model_dir: Path | None = None, name: str = DEFAULT_MODEL_NAME) -> None:
     """Warm up model loading at app startup to fail fast on packaging issues."""
-    global _MODEL
     with _MODEL_LOCK:
-        if _MODEL is not None:
+        _load_model_locked(name, model_dir)
+
+
+def prewarm_models(*extra_names: str) -> None:
+    """Start loading evicted models (base plus ``extra_names``) in the background."""
+    missing = [name for name in (DEFAULT_MODEL_NAME, *extra_names) if name and name not in _MODELS]
+    if not missing:
+        return
+
+    def _load() -> None:
+        for name in missing:
+            try:
+                preload_model(name=name)
+            except Exception:
+                # The transcription call will retry and surface the real error.
+                return
+
+    threading.Thread(target=_load, name="model-prewarm", daemon=True).start()
+
+
+def unload_models() -> None:
+    """Drop every resident model and hand the freed memory back to the OS."""
+    with _MODEL_LOCK:
+        if not _MODELS or _IN_FLIGHT:
             return
-        resolved = model_dir or _resolve_model_dir()
-        resolved.mkdir(parents=True, exist_ok=True)
-        _MODEL = whisper.load_model(_MODEL_NAME, download_root=str(resolved))
+        _MODELS.clear()
+        gc.collect()
+        try:
+            import torch
+
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        except Exception:
+            pass
+        if sys.platform.startswith("linux"):
+            # glibc keeps freed tensor arenas mapped unless asked to trim.
+            try:
+                ctypes.CDLL("libc.so.6").malloc_trim(0)
+            except (OSError, AttributeError):
+                pass
+
+
+def start_idle_eviction(idle_seconds: float) -> None:
+    """Unload models after ``idle_seconds`` without use; ``0`` keeps them resident."""
+    global _EVICTOR
+    if idle_seconds <= 0 or _EVICTOR is not None:
+        return
+    _EVICTOR_STOP.clear()
 
+    def _watch() -> None:
+        interval = min(60.0, max(1.0, idle_seconds / 4))
+        while not _EVICTOR_STOP.wait(interval):
+            if _MODELS and time.monotonic() - _LAST_USED >= idle_seconds:
+                unload_models()
 
-def transcribe(path: Path) -> str:
-    """Transcribe a WAV file with local Whisper and return text."""
+    _EVICTOR = threading.Thread(target=_watch, name="model-evictor", daemon=True)
+    _EVICTOR.start()
+
+
+def stop_idle_eviction() -> None:
+    global _EVICTOR
+    _EVICTOR_STOP.set()
+    _EVICTOR = None
+
+
+def _current_rss_bytes() -> int:
+    """Best-effort resident set size of this process (0 if unavailable)."""
+    try:
+        if sys.platform == "win32":
+            from ctypes import wintypes
+
+            class _ProcessMemoryCounters(ctypes.Structure):
+                _fields_ = [
+                    ("cb", wintypes.DWORD),
+                    ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t),
+                    ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t),
+                    ("PeakPagefileUsage", ctypes.c_size_t),
+                ]
+
+            counters = _ProcessMemoryCounters()
+            counters.cb = ctypes.sizeof(counters)
+            get_process = ctypes.windll.kernel32.GetCurrentProcess
+            get_info = ctypes.windll.psapi.GetProcessMemoryInfo
+            get_process.restype = wintypes.HANDLE
+            if get_info(get_process(), ctypes.byref(counters), counters.cb):
+                return int(counters.WorkingSetSize)
+            return 0
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def get_memory_stats() -> dict:
+    """Snapshot of process RSS and model residency for monitoring."""
+    return {
+        "rss_bytes": _current_rss_bytes(),
+        "resident_models": list(_MODELS),
+        "loading_models": sorted(_LOADING),
+        "idle_seconds": round(time.monotonic() - _LAST_USED, 1),
+        "in_flight": _IN_FLIGHT,
+        "idle_eviction": _EVICTOR is not None,
+    }
+
+
+def _to_whisper_input(audio: Path | np.ndarray) -> str | np.ndarray:
+    """Pass file paths through; convert in-memory 16 kHz PCM to mono float32."""
+    if isinstance(audio, Path):
+        return str(audio)
+    samples = audio.astype(np.float32)
+    if np.issubdtype(audio.dtype, np.integer):
+        samples /= float(np.iinfo(audio.dtype).max + 1)
+    return samples.mean(axis=1) if samples.ndim == 2 else samples
+
+
+def _refine_segments(
+    result: TranscriptionResult,
+    audio: str | np.ndarray,
+    refine: RefineConfig,
+    word_timestamps: bool,
+) -> TranscriptionResult:
+    """Re-decode only low-confidence segments with the larger model and beam search."""
+    targets = [segment for segment in result.segments if refine.needs_refinement(segment)]
+    if not targets:
+        return result
+
+    samples = whisper.load_audio(audio) if isinstance(audio, str) else audio
+    model = _get_model(refine.model_name)
+
+    for segment in targets:
+        clip = samples[int(segment.start * _SAMPLE_RATE) : int(segment.end * _SAMPLE_RATE)]
+        if clip.size == 0:
+            continue
+        refined = TranscriptionResult.from_whisper(
+            model.transcribe(
+                clip,
+                language="zh",
+                fp16=False,
+                beam_size=refine.beam_size,
+                temperature=0.0,
+                condition_on_previous_text=False,
+                word_timestamps=word_timestamps,
+            )
+        )
+        if not refined.segments:
+            continue
+        avg_logprob = float(np.mean([part.avg_logprob for part in refined.segments]))
+        no_speech_prob = max(part.no_speech_prob for part in refined.segments)
+        compression_ratio = max(part.compression_ratio for part in refined.segments)
+        # Beam search on a short clip can still do worse; keep the fast-model result unless it clearly improves.
+        if not refine.improves(segment, avg_logprob, no_speech_prob, compression_ratio):
+            continue
+
+        segment.text = "".join(part.text for part in refined.segments)
+        segment.avg_logprob = avg_logprob
+        segment.no_speech_prob = no_speech_prob
+        segment.compression_ratio = compression_ratio
+        segment.words = [
+            TranscriptWord(
+                text=word.text,
+                start=word.start + segment.start,
+                end=word.end + segment.start,
+                probability=word.probability,
+            )
+            for part in refined.segments
+            for word in part.words
+        ]
+
+    result.text = "".join(segment.text for segment in result.segments).strip()
+    return result
+
+
+def transcribe_detailed(
+    audio: Path | np.ndarray,
+    word_timestamps: bool = False,
+    refine: RefineConfig | None = None,
+    model_name: str = DEFAULT_MODEL_NAME,
+) -> TranscriptionResult:
+    """Transcribe and keep segment timings/confidence (and optionally word timings).
+
+    With ``refine`` set, the fast model decodes greedily first and only
+    segments failing the confidence thresholds are decoded again.
+    """
+    global _IN_FLIGHT, _LAST_USED
+    with _MODEL_LOCK:
+        _IN_FLIGHT += 1
     try:
-        model = _get_model()
-        result = model.transcribe(str(path), language="zh", fp16=False)
-        return str(result.get("text", "")).strip()
+        model = _get_model(model_name)
+        whisper_input = _to_whisper_input(audio)
+        result = TranscriptionResult.from_whisper(
+            model.transcribe(
+                whisper_input,
+                language="zh",
+                fp16=False,
+                word_timestamps=word_timestamps,
+            )
+        )
+        if refine is not None:
+            result = _refine_segments(result, whisper_input, refine, word_timestamps)
+        return result
     except Exception as exc:
         raise LocalTranscriberError("Local Whisper transcription failed.") from exc
+    finally:
+        with _MODEL_LOCK:
+            _IN_FLIGHT -= 1
+            _LAST_USED = time.monotonic()
+
+
+def transcribe(audio: Path | np.ndarray) -> str:
+    """Transcribe a WAV file or in-memory 16 kHz samples with local Whisper and return text."""
+    return transcribe_detailed(audio).text
@@ -0,0 +1,279 @@
+"""Segment/word timing and confidence metadata, stored as packed binary records."""
+
+from __future__ import annotations
+
+import os
+import struct
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterator
+
+import numpy as np
+
+# Segments below this average log-probability are shown as low confidence.
+LOW_CONFIDENCE_LOGPROB = -1.0
+HIGH_NO_SPEECH_PROB = 0.6
+
+
+@dataclass
+class TranscriptWord:
+    """Single word with timing and probability (word_timestamps mode only)."""
+
+    text: str
+    start: float
+    end: float
+    probability: float
+
+
+@dataclass
+class TranscriptSegment:
+    """Whisper segment with timing and decoder confidence metrics."""
+
+    text: str
+    start: float
+    end: float
+    avg_logprob: float
+    no_speech_prob: float
+    compression_ratio: float
+    words: list[TranscriptWord] = field(default_factory=list)
+
+    @property
+    def is_low_confidence(self) -> bool:
+        return self.avg_logprob < LOW_CONFIDENCE_LOGPROB or self.no_speech_prob > HIGH_NO_SPEECH_PROB
+
+
+@dataclass
+class TranscriptionResult:
+    """Full transcription output: plain text plus per-segment metadata."""
+
+    text: str
+    segments: list[TranscriptSegment] = field(default_factory=list)
+
+    @classmethod
+    def from_whisper(cls, result: dict) -> "TranscriptionResult":
+        segments = []
+        for raw in result.get("segments", []):
+            words = [
+                TranscriptWord(
+                    text=str(word.get("word", "")),
+                    start=float(word.get("start", 0.0)),
+                    end=float(word.get("end", 0.0)),
+                    probability=float(word.get("probability", 0.0)),
+                )
+                for word in raw.get("words", []) or []
+            ]
+            segments.append(
+                TranscriptSegment(
+                    text=str(raw.get("text", "")),
+                    start=float(raw.get("start", 0.0)),
+                    end=float(raw.get("end", 0.0)),
+                    avg_logprob=float(raw.get("avg_logprob", 0.0)),
+                    no_speech_prob=float(raw.get("no_speech_prob", 0.0)),
+                    compression_ratio=float(raw.get("compression_ratio", 0.0)),
+                    words=words,
+                )
+            )
+        return cls(text=str(result.get("text", "")).strip(), segments=segments)
+
+
+# One record per entry, appended to a single shared file:
+#   header | entry id (UTF-8) | segment rows | word rows | segment texts | word texts
+_RECORD_HEADER = struct.Struct("<BIII")  # id bytes, segment count, word count, text bytes
+_SEGMENT_DTYPE = np.dtype(
+    [
+        ("start", "<f4"),
+        ("end", "<f4"),
+        ("avg_logprob", "<f4"),
+        ("no_speech_prob", "<f4"),
+        ("compression_ratio", "<f4"),
+        ("text_bytes", "<u4"),
+    ]
+)
+_WORD_DTYPE = np.dtype(
+    [
+        ("segment", "<u4"),
+        ("start", "<f4"),
+        ("end", "<f4"),
+        ("probability", "<f4"),
+        ("text_bytes", "<u4"),
+    ]
+)
+
+
+def _encode_record(entry_id: str, result: TranscriptionResult) -> bytes:
+    segments = result.segments
+    words = [(index, word) for index, segment in enumerate(segments) for word in segment.words]
+    seg_texts = [segment.text.encode("utf-8") for segment in segments]
+    word_texts = [word.text.encode("utf-8") for _, word in words]
+
+    seg_rows = np.array(
+        [
+            (s.start, s.end, s.avg_logprob, s.no_speech_prob, s.compression_ratio, len(text))
+            for s, text in zip(segments, seg_texts)
+        ],
+        dtype=_SEGMENT_DTYPE,
+    )
+    word_rows = np.array(
+        [(index, w.start, w.end, w.probability, len(text)) for (index, w), text in zip(words, word_texts)],
+        dtype=_WORD_DTYPE,
+    )
+    texts = b"".join(seg_texts + word_texts)
+    key = entry_id.encode("utf-8")
+    header = _RECORD_HEADER.pack(len(key), len(seg_rows), len(word_rows), len(texts))
+    return header + key + seg_rows.tobytes() + word_rows.tobytes() + texts
+
+
+def _iter_records(data: bytes) -> Iterator[tuple[str, int, int]]:
+    """Yield ``(entry_id, start, end)`` byte ranges; a truncated tail record is ignored."""
+    offset = 0
+    while offset + _RECORD_HEADER.size <= len(data):
+        key_bytes, seg_count, word_count, text_bytes = _RECORD_HEADER.unpack_from(data, offset)
+        body_start = offset + _RECORD_HEADER.size
+        end = (
+            body_start
+            + key_bytes
+            + seg_count * _SEGMENT_DTYPE.itemsize
+            + word_count * _WORD_DTYPE.itemsize
+            + text_bytes
+        )
+        if end > len(data):
+            return
+        yield data[body_start : body_start + key_bytes].decode("utf-8", errors="replace"), offset, end
+        offset = end
+
+
+def _decode_record(record: bytes) -> list[TranscriptSegment]:
+    key_bytes, seg_count, word_count, _ = _RECORD_HEADER.unpack_from(record)
+    offset = _RECORD_HEADER.size + key_bytes
+    seg_rows = np.frombuffer(record, dtype=_SEGMENT_DTYPE, count=seg_count, offset=offset)
+    offset += seg_rows.nbytes
+    word_rows = np.frombuffer(record, dtype=_WORD_DTYPE, count=word_count, offset=offset)
+    offset += word_rows.nbytes
+
+    segments = []
+    for row in seg_rows:
+        text = record[offset : offset + int(row["text_bytes"])].decode("utf-8")
+        offset += int(row["text_bytes"])
+        segments.append(
+            TranscriptSegment(
+                text=text,
+                start=float(row["start"]),
+                end=float(row["end"]),
+                avg_logprob=float(row["avg_logprob"]),
+                no_speech_prob=float(row["no_speech_prob"]),
+                compression_ratio=float(row["compression_ratio"]),
+            )
+        )
+    for row in word_rows:
+        text = record[offset : offset + int(row["text_bytes"])].decode("utf-8")
+        offset += int(row["text_bytes"])
+        segments[int(row["segment"])].words.append(
+            TranscriptWord(
+                text=text,
+                start=float(row["start"]),
+                end=float(row["end"]),
+                probability=float(row["probability"]),
+            )
+        )
+    return segments
+
+
+_FILE_LOCKS: dict[Path, threading.Lock] = {}
+_FILE_LOCKS_GUARD = threading.Lock()
+
+
+def _lock_for(path: Path) -> threading.Lock:
+    """Return the process-wide lock for ``path``, shared by every store on that file."""
+    with _FILE_LOCKS_GUARD:
+        return _FILE_LOCKS.setdefault(path.resolve(), threading.Lock())
+
+
+class SegmentStore:
+    """Keep every entry's segment metadata as packed binary records in one file.
+
+    Entries are appended on save; delete and prune rewrite the (small) file
+    and swap it in atomically. Stores opened on the same file share one lock.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = _lock_for(path)
+
+    def _read(self) -> bytes:
+        try:
+            return self.path.read_bytes()
+        except FileNotFoundError:
+            return b""
+
+    def _rewrite(self, data: bytes, keep: Callable[[str], bool]) -> None:
+        kept = b"".join(data[start:end] for entry_id, start, end in _iter_records(data) if keep(entry_id))
+        fd, temp_name = tempfile.mkstemp(dir=self.path.parent, prefix=f"{self.path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(kept)
+            os.replace(temp_name, self.path)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+
+    def save(self, entry_id: str, result: TranscriptionResult) -> None:
+        record = _encode_record(entry_id, result)
+        with self._lock:
+            data = self._read()
+            records = list(_iter_records(data))
+            complete = records[-1][2] if records else 0
+            # Re-transcription drops the old record; a torn tail from a crash is cut off before appending.
+            if complete != len(data) or any(stored_id == entry_id for stored_id, _, _ in records):
+                self._rewrite(data, lambda stored_id: stored_id != entry_id)
+            with self.path.open("ab") as handle:
+                handle.write(record)
+
+    def load(self, entry_id: str) -> list[TranscriptSegment]:
+        """Return stored segments, or an empty list when none were kept."""
+        if not entry_id:
+            return []
+        data = self._read()
+        matches = [(start, end) for stored_id, start, end in _iter_records(data) if stored_id == entry_id]
+        if not matches:
+            return []
+        start, end = matches[-1]
+        try:
+            return _decode_record(data[start:end])
+        except Exception:
+            return []
+
+    def delete(self, entry_id: str) -> None:
+        if not entry_id:
+            return
+        with self._lock:
+            data = self._read()
+            if any(stored_id == entry_id for stored_id, _, _ in _iter_records(data)):
+                self._rewrite(data, lambda stored_id: stored_id != entry_id)
+
+    def prune(self, keep_ids: set[str]) -> None:
+        """Remove records whose history entry no longer exists."""
+        with self._lock:
+            data = self._read()
+            if data:
+                self._rewrite(data, lambda stored_id: stored_id in keep_ids)
+
+
+def _format_srt_time(seconds: float) -> str:
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+
+
+def format_srt(segments: list[TranscriptSegment]) -> str:
+    """Render segments as an SRT subtitle document."""
+    blocks = []
+    for index, segment in enumerate(segments, start=1):
+        blocks.append(
+            f"{index}\n{_format_srt_time(segment.start)} --> {_format_srt_time(segment.end)}\n{segment.text.strip()}\n"
+        )
+    return "\n".join(blocks)
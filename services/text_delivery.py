@@ -0,0 +1,332 @@
+"""Deliver transcripts to the user: clipboard backends and direct typing.
+
+All backends are driven by one ``TextDeliveryService`` worker thread, so
+results leave in the same order the transcription queue produced them.
+"""
+
+from __future__ import annotations
+
+import queue
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable
+
+from services.clipboard_service import ClipboardService
+
+
+class TextDeliveryError(Exception):
+    """Raised when a backend cannot deliver text."""
+
+
+class TextDeliveryBackend(ABC):
+    """One way of handing text to the user."""
+
+    name = "backend"
+
+    @abstractmethod
+    def deliver(self, text: str) -> None:
+        """Deliver ``text``; called only from the delivery worker thread."""
+
+    def close(self) -> None:
+        """Release any persistent handle held by the backend."""
+
+
+class PyperclipBackend(TextDeliveryBackend):
+    """Fallback clipboard via pyperclip (spawns xclip/xsel per call on Linux)."""
+
+    name = "pyperclip"
+
+    def deliver(self, text: str) -> None:
+        try:
+            ClipboardService.copy_text(text)
+        except Exception as exc:
+            raise TextDeliveryError("Unable to copy text to clipboard.") from exc
+
+
+class WindowsClipboardBackend(TextDeliveryBackend):
+    """Native Win32 clipboard through ctypes; DLL handles are bound once and reused.
+
+    ``SetClipboardData`` needs a real owner window, so the backend keeps one
+    message-only window on its own thread.  That thread also pumps the
+    messages other applications send to the clipboard owner, so they never
+    block on us.
+    """
+
+    name = "win32-clipboard"
+
+    CF_UNICODETEXT = 13
+    GMEM_MOVEABLE = 0x0002
+    HWND_MESSAGE = -3
+    WM_QUIT = 0x0012
+    WM_APP = 0x8000
+    OPEN_RETRIES = 10
+    CALL_TIMEOUT_SECONDS = 5.0
+
+    def __init__(self) -> None:
+        import ctypes
+        from ctypes import wintypes
+
+        self._ctypes = ctypes
+        self._wintypes = wintypes
+        user32 = ctypes.WinDLL("user32", use_last_error=True)
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+
+        self._open = user32.OpenClipboard
+        self._open.argtypes = [wintypes.HWND]
+        self._open.restype = wintypes.BOOL
+        self._empty = user32.EmptyClipboard
+        self._empty.restype = wintypes.BOOL
+        self._set_data = user32.SetClipboardData
+        self._set_data.argtypes = [wintypes.UINT, wintypes.HANDLE]
+        self._set_data.restype = wintypes.HANDLE
+        self._close = user32.CloseClipboard
+        self._close.restype = wintypes.BOOL
+
+        self._create_window = user32.CreateWindowExW
+        self._create_window.argtypes = [
+            wintypes.DWORD,
+            wintypes.LPCWSTR,
+            wintypes.LPCWSTR,
+            wintypes.DWORD,
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_int,
+            wintypes.HWND,
+            wintypes.HMENU,
+            wintypes.HINSTANCE,
+            wintypes.LPVOID,
+        ]
+        self._create_window.restype = wintypes.HWND
+        self._destroy_window = user32.DestroyWindow
+        self._destroy_window.argtypes = [wintypes.HWND]
+        self._get_message = user32.GetMessageW
+        self._get_message.argtypes = [ctypes.POINTER(wintypes.MSG), wintypes.HWND, wintypes.UINT, wintypes.UINT]
+        self._get_message.restype = wintypes.BOOL
+        self._translate_message = user32.TranslateMessage
+        self._translate_message.argtypes = [ctypes.POINTER(wintypes.MSG)]
+        self._dispatch_message = user32.DispatchMessageW
+        self._dispatch_message.argtypes = [ctypes.POINTER(wintypes.MSG)]
+        self._post_thread_message = user32.PostThreadMessageW
+        self._post_thread_message.argtypes = [wintypes.DWORD, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM]
+        self._post_thread_message.restype = wintypes.BOOL
+
+        self._alloc = kernel32.GlobalAlloc
+        self._alloc.argtypes = [wintypes.UINT, ctypes.c_size_t]
+        self._alloc.restype = wintypes.HGLOBAL
+        self._lock = kernel32.GlobalLock
+        self._lock.argtypes = [wintypes.HGLOBAL]
+        self._lock.restype = wintypes.LPVOID
+        self._unlock = kernel32.GlobalUnlock
+        self._unlock.argtypes = [wintypes.HGLOBAL]
+        self._free = kernel32.GlobalFree
+        self._free.argtypes = [wintypes.HGLOBAL]
+        self._current_thread_id = kernel32.GetCurrentThreadId
+        self._current_thread_id.restype = wintypes.DWORD
+
+        self._requests: queue.Queue[tuple[str, threading.Event, list[Exception]]] = queue.Queue()
+        self._hwnd = None
+        self._thread_id = 0
+        self._ready = threading.Event()
+        threading.Thread(target=self._window_loop, name="win32-clipboard-owner", daemon=True).start()
+        self._ready.wait(self.CALL_TIMEOUT_SECONDS)
+        if not self._hwnd:
+            # create_clipboard_backend falls back to the next backend on OSError.
+            raise OSError("Unable to create the clipboard owner window.")
+
+    def deliver(self, text: str) -> None:
+        done = threading.Event()
+        errors: list[Exception] = []
+        self._requests.put((text, done, errors))
+        if not self._thread_id or not self._post_thread_message(self._thread_id, self.WM_APP, 0, 0):
+            raise TextDeliveryError("Clipboard owner window is not running.")
+        if not done.wait(self.CALL_TIMEOUT_SECONDS):
+            raise TextDeliveryError("Timed out writing to the clipboard.")
+        if errors:
+            raise errors[0]
+
+    def close(self) -> None:
+        if self._thread_id:
+            self._post_thread_message(self._thread_id, self.WM_QUIT, 0, 0)
+            self._thread_id = 0
+
+    def _window_loop(self) -> None:
+        # The window (and its message queue) belongs to this thread for the backend's lifetime.
+        self._thread_id = self._current_thread_id()
+        self._hwnd = self._create_window(
+            0, "STATIC", None, 0, 0, 0, 0, 0, self._wintypes.HWND(self.HWND_MESSAGE), None, None, None
+        )
+        self._ready.set()
+        if not self._hwnd:
+            return
+
+        message = self._wintypes.MSG()
+        try:
+            while self._get_message(self._ctypes.byref(message), None, 0, 0) > 0:
+                if not message.hWnd and message.message == self.WM_APP:
+                    self._drain_requests()
+                    continue
+                self._translate_message(self._ctypes.byref(message))
+                self._dispatch_message(self._ctypes.byref(message))
+        finally:
+            self._destroy_window(self._hwnd)
+            self._hwnd = None
+
+    def _drain_requests(self) -> None:
+        while True:
+            try:
+                text, done, errors = self._requests.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                self._set_clipboard(text)
+            except TextDeliveryError as exc:
+                errors.append(exc)
+            finally:
+                done.set()
+
+    def _set_clipboard(self, text: str) -> None:
+        data = text.encode("utf-16-le") + b"\x00\x00"
+
+        # Another application may briefly hold the clipboard open.
+        for _ in range(self.OPEN_RETRIES):
+            if self._open(self._hwnd):
+                break
+            time.sleep(0.01)
+        else:
+            raise TextDeliveryError("Clipboard is locked by another application.")
+
+        try:
+            if not self._empty():
+                raise TextDeliveryError("Unable to empty the clipboard.")
+            handle = self._alloc(self.GMEM_MOVEABLE, len(data))
+            if not handle:
+                raise TextDeliveryError("Unable to allocate clipboard memory.")
+            pointer = self._lock(handle)
+            if not pointer:
+                self._free(handle)
+                raise TextDeliveryError("Unable to lock clipboard memory.")
+            self._ctypes.memmove(pointer, data, len(data))
+            self._unlock(handle)
+            # On success the clipboard owns the memory; only free it on failure.
+            if not self._set_data(self.CF_UNICODETEXT, handle):
+                self._free(handle)
+                raise TextDeliveryError("Unable to set clipboard data.")
+        finally:
+            self._close()
+
+
+class TkClipboardBackend(TextDeliveryBackend):
+    """Clipboard owned by the running Tk app over its existing display connection."""
+
+    name = "tk-clipboard"
+
+    def __init__(self, root) -> None:  # noqa: ANN001
+        self.root = root
+
+    def deliver(self, text: str) -> None:
+        # Tk calls must run on the Tk thread; after() callbacks keep FIFO order.
+        self.root.after(0, self._set_clipboard, text)
+
+    def _set_clipboard(self, text: str) -> None:
+        self.root.clipboard_clear()
+        self.root.clipboard_append(text)
+
+
+class TypingBackend(TextDeliveryBackend):
+    """Type text into the focused window with pynput, in rate-limited chunks."""
+
+    name = "typing"
+
+    def __init__(
+        self,
+        chunk_size: int = 16,
+        chars_per_second: float = 400.0,
+        on_typing: Callable[[bool], None] | None = None,
+    ) -> None:
+        # pynput needs a display server, so only import it when typing is enabled.
+        from pynput import keyboard
+
+        self._controller = keyboard.Controller()
+        self.chunk_size = max(1, chunk_size)
+        self.chars_per_second = chars_per_second
+        # Told when typing starts and stops; the global hotkey listener sees these keystrokes too.
+        self.on_typing = on_typing
+
+    def deliver(self, text: str) -> None:
+        interval = self.chunk_size / self.chars_per_second if self.chars_per_second > 0 else 0.0
+        if self.on_typing is not None:
+            self.on_typing(True)
+        try:
+            for start in range(0, len(text), self.chunk_size):
+                try:
+                    self._controller.type(text[start : start + self.chunk_size])
+                except Exception as exc:
+                    raise TextDeliveryError("Unable to type into the focused window.") from exc
+                # Pause between chunks so slow target apps do not drop keystrokes.
+                if interval:
+                    time.sleep(interval)
+        finally:
+            if self.on_typing is not None:
+                self.on_typing(False)
+
+
+def create_clipboard_backend(root=None) -> TextDeliveryBackend:  # noqa: ANN001
+    """Pick the cheapest clipboard backend available on this platform."""
+    if sys.platform == "win32":
+        try:
+            return WindowsClipboardBackend()
+        except (OSError, AttributeError):
+            pass
+    if root is not None:
+        return TkClipboardBackend(root)
+    # Headless daemons on Linux/macOS still pay one xclip/xsel/pbcopy spawn per result;
+    # there is no persistent X11/Wayland clipboard owner here.
+    return PyperclipBackend()
+
+
+class TextDeliveryService:
+    """Deliver texts in submission order through every configured backend."""
+
+    def __init__(
+        self,
+        backends: list[TextDeliveryBackend],
+        on_error: Callable[[TextDeliveryBackend, Exception], None] | None = None,
+    ) -> None:
+        self.backends = backends
+        self.on_error = on_error
+        self._queue: queue.Queue[str | None] = queue.Queue()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None or not self.backends:
+            return
+        self._thread = threading.Thread(target=self._worker_loop, name="text-delivery", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread = None
+
+    def deliver(self, text: str) -> None:
+        """Queue text for delivery and return immediately."""
+        if self.backends:
+            self._queue.put(text)
+
+    def _worker_loop(self) -> None:
+        while True:
+            text = self._queue.get()
+            if text is None:
+                for backend in self.backends:
+                    backend.close()
+                return
+            for backend in self.backends:
+                try:
+                    backend.deliver(text)
+                except Exception as exc:
+                    if self.on_error is not None:
+                        self.on_error(backend, exc)
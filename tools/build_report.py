@@ -0,0 +1,101 @@
+"""Size and startup report for a PyInstaller build of VoiceToType.
+
+Called from VoiceToType.spec after each build, or by hand:
+
+    python tools/build_report.py dist/VoiceToType
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Cold-start launches measured per build; VOICETOTYPE_STARTUP_RUNS=0 skips them.
+DEFAULT_STARTUP_RUNS = 3
+STARTUP_TIMEOUT_SECONDS = 300
+
+
+def _tree_size(path: Path) -> int:
+    if path.is_file():
+        return path.stat().st_size
+    return sum(item.stat().st_size for item in path.rglob("*") if item.is_file())
+
+
+def _size_breakdown(output_path: Path, limit: int = 15) -> dict[str, int]:
+    """Largest top-level components of a onedir build (PyInstaller 6 puts them in _internal/)."""
+    if output_path.is_file():
+        return {output_path.name: output_path.stat().st_size}
+    contents = output_path / "_internal"
+    root = contents if contents.is_dir() else output_path
+    sizes = {item.name: _tree_size(item) for item in root.iterdir()}
+    return dict(sorted(sizes.items(), key=lambda pair: pair[1], reverse=True)[:limit])
+
+
+def _find_executable(output_path: Path) -> Path | None:
+    if output_path.is_file():
+        return output_path
+    for name in ("VoiceToType.exe", "VoiceToType"):
+        candidate = output_path / name
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def _measure_startup(executable: Path, runs: int) -> list[dict]:
+    """Launch the build with --startup-probe and record wall time plus in-process timings."""
+    results = []
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            probe_file = Path(temp_dir) / "probe.json"
+            started = time.perf_counter()
+            try:
+                subprocess.run(
+                    [str(executable), "--startup-probe", str(probe_file)],
+                    check=False,
+                    timeout=STARTUP_TIMEOUT_SECONDS,
+                )
+            except (OSError, subprocess.TimeoutExpired) as exc:
+                results.append({"error": str(exc)})
+                continue
+            wall_seconds = round(time.perf_counter() - started, 3)
+            probe = json.loads(probe_file.read_text(encoding="utf-8")) if probe_file.exists() else {}
+            results.append({"wall_seconds": wall_seconds, **probe})
+    return results
+
+
+def write_build_report(
+    output_path: Path,
+    profile: str = "slim",
+    bundled_models: list[str] | None = None,
+    report_path: Path | None = None,
+) -> dict:
+    """Write and print a JSON report; returns the report dictionary."""
+    runs = int(os.environ.get("VOICETOTYPE_STARTUP_RUNS", DEFAULT_STARTUP_RUNS))
+    executable = _find_executable(output_path)
+    report = {
+        "profile": profile,
+        "bundled_models": bundled_models or [],
+        "output": str(output_path),
+        "total_bytes": _tree_size(output_path),
+        "largest_components": _size_breakdown(output_path),
+        "startup": _measure_startup(executable, runs) if executable is not None and runs > 0 else [],
+    }
+
+    report_path = report_path or output_path.parent / "VoiceToType-build-report.json"
+    report_path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    print(f"[build-report] {profile}: {report['total_bytes'] / 1024 / 1024:.1f} MB -> {report_path}")
+    for run in report["startup"]:
+        print(f"[build-report] startup: {run}")
+    return report
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        raise SystemExit("usage: python tools/build_report.py dist/VoiceToType")
+    write_build_report(Path(sys.argv[1]))
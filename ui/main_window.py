@@ -2,20 +2,25 @@
 
 from __future__ import annotations
 
-import threading
 from enum import Enum
-from pathlib import Path
 from tkinter import BOTH, END, LEFT, RIGHT, VERTICAL, Button, Canvas, Entry, Frame, Label, Scrollbar, StringVar, Text, Tk, messagebox
+from typing import TYPE_CHECKING
 
 from pynput import keyboard
 
-from audio.recorder import AudioRecorder, AudioRecorderError
-from services.clipboard_service import ClipboardService
-from services.history_manager import HistoryManager
-from services.hotkey_manager import HotkeyError, HotkeyManager
-from services.local_transcriber import LocalTranscriberError, transcribe
+from services.engine_events import EngineError, EngineEvent
+from services.hotkey_manager import HotkeyError
 from services.text_cleaner import clean_text
 
+if TYPE_CHECKING:
+    # The local engine pulls in Whisper/torch; a thin client of the daemon never needs it.
+    from services.engine import TranscriptionEngine
+    from services.engine_client import RemoteEngine
+
+
+# How often the memory/model indicator is refreshed.
+MEMORY_REFRESH_MS = 5000
+
 
 class AppStatus(str, Enum):
     IDLE = "待機"
@@ -26,21 +31,23 @@ class AppStatus(str, Enum):
 
 
 class VoiceToTypeApp:
-    """Main application composition root."""
+    """Tk front-end over a local ``TranscriptionEngine`` or a daemon ``RemoteEngine``."""
 
-    def __init__(self, root: Tk) -> None:
+    def __init__(self, root: Tk, engine: TranscriptionEngine | RemoteEngine) -> None:
         self.root = root
         self.root.title("VoiceToType - 語音轉文字")
         self.root.geometry("820x580")
 
         self.status_var = StringVar(value=AppStatus.IDLE.value)
         self.hotkey_var = StringVar(value="right alt")
+        self.memory_var = StringVar(value="")
 
-        self.recorder = AudioRecorder()
-        self.history_manager = HistoryManager()
-
-        self.hotkey_manager = HotkeyManager(on_toggle=self.on_hotkey_toggle)
-        self.hotkey_manager.start()
+        # Engine callbacks arrive on worker/listener threads; marshal into Tk loop.
+        self.engine = engine
+        # Share the engine's manager: one writer per history file (the daemon's, in thin-client mode).
+        self.history_manager = engine.history_manager
+        self.engine.add_listener(lambda event: self.root.after(0, self._handle_engine_event, event))
+        self.engine.start()
 
         # Global hotkey for quickly showing the app window.
         self.wake_hotkey = keyboard.GlobalHotKeys({"<ctrl>+<alt>+w": self._handle_wake_hotkey})
@@ -48,6 +55,7 @@ class VoiceToTypeApp:
 
         self._build_layout()
         self._load_history()
+        self._refresh_memory()
 
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
@@ -60,6 +68,7 @@ class VoiceToTypeApp:
 
         Label(top_bar, text="目前狀態：").pack(side=LEFT)
         Label(top_bar, textvariable=self.status_var, fg="#0f4c81").pack(side=LEFT)
+        Label(top_bar, textvariable=self.memory_var, fg="#666").pack(side=RIGHT)
 
         controls = Frame(self.root)
         controls.pack(fill="x", padx=12, pady=6)
@@ -78,6 +87,7 @@ class VoiceToTypeApp:
         Label(result_panel, text="最新結果（已自動複製到剪貼簿）").pack(anchor="w")
         self.result_text = Text(result_panel, height=10, wrap="word")
         self.result_text.pack(fill=BOTH, expand=False, pady=4)
+        self.result_text.tag_configure("low_confidence", background="#fff3b0")
 
         history_row = Frame(result_panel)
         history_row.pack(fill=BOTH, expand=True, pady=6)
@@ -119,19 +129,30 @@ class VoiceToTypeApp:
             Label(self.history_rows_frame, text="（目前尚無歷史紀錄）", fg="#666").pack(anchor="w", padx=4, pady=4)
             return
 
-        for index, entry in enumerate(entries):
+        for entry in entries:
             row = Frame(self.history_rows_frame)
             row.pack(fill="x", padx=2, pady=2)
 
             text_preview = f"[{entry.timestamp}] {entry.text}"
             Label(row, text=text_preview, anchor="w", justify="left", wraplength=640).pack(side=LEFT, fill="x", expand=True)
-            Button(row, text="刪除", command=lambda i=index: self.delete_history_item(i)).pack(side=RIGHT, padx=4)
+            Button(
+                row,
+                text="刪除",
+                command=lambda entry_id=entry.entry_id: self.delete_history_item(entry_id),
+            ).pack(side=RIGHT, padx=4)
+            # Only offer re-transcription when a different (larger) model would actually decode it.
+            if self.engine.retranscribe_model and self.history_manager.audio_archive.path_for(entry.entry_id):
+                Button(
+                    row,
+                    text="重新辨識",
+                    command=lambda entry_id=entry.entry_id: self.retranscribe_history_item(entry_id),
+                ).pack(side=RIGHT, padx=4)
 
     def apply_hotkey(self) -> None:
         try:
-            self.hotkey_manager.set_hotkey(self.hotkey_var.get())
+            self.engine.set_hotkey(self.hotkey_var.get())
             messagebox.showinfo("快捷鍵更新", "新的錄音全域快捷鍵已套用。")
-        except HotkeyError as exc:
+        except (HotkeyError, EngineError) as exc:
             messagebox.showerror("快捷鍵格式錯誤", str(exc))
 
     def _handle_wake_hotkey(self) -> None:
@@ -150,48 +171,23 @@ class VoiceToTypeApp:
 
     def on_hotkey_toggle(self) -> None:
         """Start recording on first press, stop and process on second press."""
-        if self.recorder.is_recording:
-            self._stop_recording_and_process()
-        else:
-            self._start_recording()
-
-    def _start_recording(self) -> None:
-        if self.status_var.get() == AppStatus.PROCESSING.value:
-            return
-
-        try:
-            self.recorder.start()
-            self.status_var.set(AppStatus.RECORDING.value)
-        except AudioRecorderError as exc:
-            self.status_var.set(AppStatus.ERROR.value)
-            messagebox.showerror("錄音錯誤", f"無法開始錄音：{exc}")
+        self.engine.toggle_recording()
 
-    def _stop_recording_and_process(self) -> None:
-        try:
-            audio_path = self.recorder.stop_and_save()
-        except AudioRecorderError as exc:
+    def _handle_engine_event(self, event: EngineEvent) -> None:
+        if event.kind == "result":
+            self._update_result(event.text, AppStatus.DONE)
+            self._highlight_low_confidence(event.entry_id)
+        elif event.kind == "record_error":
             self.status_var.set(AppStatus.ERROR.value)
-            messagebox.showerror("錄音錯誤", f"無法停止錄音：{exc}")
-            return
-
-        self.status_var.set(AppStatus.PROCESSING.value)
-        worker = threading.Thread(target=self._process_audio_worker, args=(audio_path,), daemon=True)
-        worker.start()
-
-    def _process_audio_worker(self, audio_path: Path) -> None:
-        try:
-            raw_text = transcribe(audio_path)
-            polished_text = clean_text(raw_text)
-            ClipboardService.copy_text(polished_text)
-            self.history_manager.add_entry(polished_text)
-            self.root.after(0, lambda: self._update_result(polished_text, AppStatus.DONE))
-        except LocalTranscriberError as exc:
-            self.root.after(0, lambda: self._show_processing_error(f"本機語音辨識失敗：{exc}"))
-        except Exception as exc:  # pragma: no cover - broad fallback for runtime safety
-            self.root.after(0, lambda: self._show_processing_error(f"處理失敗：{exc}"))
-        finally:
-            if audio_path.exists():
-                audio_path.unlink(missing_ok=True)
+            messagebox.showerror("錄音錯誤", f"錄音失敗：{event.message}")
+        elif event.kind == "transcribe_error":
+            self._show_processing_error(f"本機語音辨識失敗：{event.message}")
+        elif event.kind == "process_error":
+            self._show_processing_error(f"處理失敗：{event.message}")
+        elif event.kind == "delivery_error":
+            self._show_processing_error(f"輸出文字失敗：{event.message}")
+        else:
+            self.status_var.set(AppStatus[event.status.name].value)
 
     def _update_result(self, text: str, status: AppStatus) -> None:
         self.result_text.delete("1.0", END)
@@ -199,14 +195,35 @@ class VoiceToTypeApp:
         self._load_history()
         self.status_var.set(status.value)
 
-    def delete_history_item(self, index: int) -> None:
+    def _highlight_low_confidence(self, entry_id: str) -> None:
+        """Mark segments Whisper was unsure about so they can be corrected quickly."""
+        for segment in self.history_manager.load_segments(entry_id):
+            if not segment.is_low_confidence:
+                continue
+            # Result text is cleaned, so search for the cleaned form of the segment.
+            needle = clean_text(segment.text)
+            if not needle:
+                continue
+            start = self.result_text.search(needle, "1.0", END)
+            if start:
+                self.result_text.tag_add("low_confidence", start, f"{start}+{len(needle)}c")
+
+    def retranscribe_history_item(self, entry_id: str) -> None:
+        """Re-run recognition on the archived audio instead of asking the user to speak again."""
+        try:
+            self.engine.retranscribe(entry_id)
+        except EngineError as exc:
+            messagebox.showerror("歷史紀錄", f"無法重新辨識：{exc}")
+
+    def delete_history_item(self, entry_id: str) -> None:
         """Delete one history item and refresh list."""
         try:
-            self.history_manager.delete_history_item(index)
+            self.engine.delete_history_entry(entry_id)
             self._load_history()
             messagebox.showinfo("歷史紀錄", "已刪除該筆歷史紀錄。")
-        except IndexError:
-            messagebox.showerror("歷史紀錄", "刪除失敗：找不到該筆歷史紀錄。")
+        except EngineError as exc:
+            self._load_history()
+            messagebox.showerror("歷史紀錄", f"刪除失敗：{exc}")
 
     def clear_all_history(self) -> None:
         """Clear all history after user confirmation."""
@@ -214,15 +231,33 @@ class VoiceToTypeApp:
         if not confirmed:
             return
 
-        self.history_manager.delete_all_history()
+        try:
+            self.engine.clear_history()
+        except EngineError as exc:
+            messagebox.showerror("歷史紀錄", f"清空失敗：{exc}")
+            return
         self._load_history()
         messagebox.showinfo("歷史紀錄", "已清空全部歷史紀錄。")
 
+    def _refresh_memory(self) -> None:
+        """Show RSS and which models are resident, so idle eviction is visible."""
+        try:
+            stats = self.engine.memory_stats()
+        except EngineError:
+            self.memory_var.set("記憶體：無法取得")
+        else:
+            models = "、".join(stats.get("resident_models", [])) or "已卸載"
+            if stats.get("loading_models"):
+                models += "（載入中）"
+            rss_mb = stats.get("rss_bytes", 0) / (1024 * 1024)
+            self.memory_var.set(f"記憶體：{rss_mb:.0f} MB｜模型：{models}")
+        self.root.after(MEMORY_REFRESH_MS, self._refresh_memory)
+
     def _show_processing_error(self, error_message: str) -> None:
         self.status_var.set(AppStatus.ERROR.value)
         messagebox.showerror("語音處理錯誤", error_message)
 
     def on_close(self) -> None:
-        self.hotkey_manager.stop()
+        self.engine.stop()
         self.wake_hotkey.stop()
         self.root.destroy()